@@ -1,23 +1,34 @@
 import os
-import sqlite3
 import threading
 import time
 import logging
 import urllib.parse
-from datetime import datetime, timedelta
-from io import BytesIO
-import requests
-from bs4 import BeautifulSoup
-import feedparser
-from flask import Flask, render_template, request, jsonify, send_file, Response, redirect
-from werkzeug.local import LocalProxy
+from datetime import datetime, timezone
+import functools
+import click
+from flask import Flask, render_template, request, jsonify, send_file, Response, redirect, g
+from markupsafe import escape
+from werkzeug.serving import is_running_from_reloader
 from flask_caching import Cache
-from dateutil import parser
 import re
 import base64
-from concurrent.futures import ThreadPoolExecutor
+import json
+import hashlib
+import gzip
+import csv
+import io
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pipeline import Pipeline, Stage
+from entry_html import process_entry_html
+from dates import parse_timestamp, struct_to_timestamp
+from dedupe import canonicalize_url, text_simhash, simhash_bands, is_near_duplicate
+from feed_schedule import PollPolicy
+from image_cache import ImageCache, normalize_url
+from metrics import Metrics
+from static_export import Snapshot
+import db
 
-app = Flask(__name__)
+app = Flask(__name__, template_folder='api/templates')
 
 # Configure logging
 logging.basicConfig(
@@ -30,8 +41,91 @@ logger = logging.getLogger(__name__)
 logging.getLogger('urllib3').setLevel(logging.ERROR)
 logging.getLogger('werkzeug').setLevel(logging.ERROR)
 
-# Configure Flask-Caching
-cache = Cache(app, config={'CACHE_TYPE': 'simple'})
+# Configure Flask-Caching as a response cache shared by every worker process.
+# Keys include the data generation, so entries are invalidated by ingestion.
+RESPONSE_CACHE_DIR = os.environ.get('RESPONSE_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'response_cache'))
+RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 86400))
+cache = Cache(app, config={
+    'CACHE_TYPE': 'FileSystemCache',
+    'CACHE_DIR': RESPONSE_CACHE_DIR,
+    'CACHE_DEFAULT_TIMEOUT': RESPONSE_CACHE_TTL,
+    'CACHE_THRESHOLD': 2000
+})
+
+# Ingestion engine settings
+INGEST_CONCURRENCY = int(os.environ.get('INGEST_CONCURRENCY', 8))  # Outbound requests in flight
+INGEST_PARSE_PROCESSES = int(os.environ.get('INGEST_PARSE_PROCESSES', min(4, os.cpu_count() or 1)))  # 0 parses inline
+INGEST_INTERVAL = 3600  # Seconds between polls of a feed with no publishing history yet
+FEED_POLL_MIN = int(os.environ.get('FEED_POLL_MIN', 300))  # Never poll a feed more often than this
+FEED_POLL_MAX = int(os.environ.get('FEED_POLL_MAX', 12 * 3600))  # Nor less often than this
+FEED_POLL_LEASE = 600  # Seconds a claimed feed stays reserved for the process polling it
+
+# Outbound HTTP settings, applied to each publisher or image host separately
+OUTBOUND_HOST_CONCURRENCY = int(os.environ.get('OUTBOUND_HOST_CONCURRENCY', 8))  # Requests in flight per host
+OUTBOUND_HOST_RATE = float(os.environ.get('OUTBOUND_HOST_RATE', 10))  # Requests per second per host; 0 for no limit
+OUTBOUND_HOST_BURST = int(os.environ.get('OUTBOUND_HOST_BURST', 20))
+OUTBOUND_RETRIES = int(os.environ.get('OUTBOUND_RETRIES', 2))  # Extra attempts for GET/HEAD after connection errors and 429/5xx
+OUTBOUND_BREAKER_THRESHOLD = int(os.environ.get('OUTBOUND_BREAKER_THRESHOLD', 5))  # Consecutive failures before a host fails fast
+OUTBOUND_BREAKER_COOLDOWN = int(os.environ.get('OUTBOUND_BREAKER_COOLDOWN', 60))  # Seconds before a failing host is tried again
+OUTBOUND_MAX_HOSTS = int(os.environ.get('OUTBOUND_MAX_HOSTS', 1024))  # Hosts whose limits and breaker state are kept
+
+# Image proxy cache settings
+IMAGE_CACHE_DIR = os.environ.get('IMAGE_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'image_cache'))
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+IMAGE_CACHE_TTL = int(os.environ.get('IMAGE_CACHE_TTL', 86400))  # Revalidate with the origin after this
+IMAGE_CACHE_NEGATIVE_TTL = int(os.environ.get('IMAGE_CACHE_NEGATIVE_TTL', 300))  # Remember failures this long
+IMAGE_MAX_BYTES = int(os.environ.get('IMAGE_MAX_BYTES', 15 * 1024 * 1024))  # Refuse to proxy anything larger
+IMAGE_FLIGHT_TIMEOUT = 30  # Seconds to wait for another request's fetch of the same image
+IMAGE_VARIANT_WIDTHS = (320, 640, 960, 1280)
+IMAGE_VARIANT_FORMATS = ('webp', 'jpeg')
+IMAGE_VARIANTS_PREGENERATE = os.environ.get('IMAGE_VARIANTS_PREGENERATE', '1') == '1'
+ARTICLE_MAX_BYTES = int(os.environ.get('ARTICLE_MAX_BYTES', 2 * 1024 * 1024))  # Stop reading article pages past this
+IMAGE_RESOLUTION_TTL = int(os.environ.get('IMAGE_RESOLUTION_TTL', 7 * 86400))  # Re-scrape article pages after this
+IMAGE_RESOLUTION_NEGATIVE_TTL = int(os.environ.get('IMAGE_RESOLUTION_NEGATIVE_TTL', 6 * 3600))  # Retry failed lookups after this
+
+# Static snapshot export settings
+EXPORT_DIR = os.environ.get('EXPORT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'public'))
+EXPORT_PAGES = int(os.environ.get('EXPORT_PAGES', 5))  # Index pages rendered to HTML
+EXPORT_SHARD_SECONDS = 7 * 86400  # Each /api/articles shard holds one week of articles
+
+# HTTP caching and compression for the JSON API
+DATA_VERSION_TTL = float(os.environ.get('DATA_VERSION_TTL', 1))  # Seconds a worker reuses the data generation when answering 304s
+API_ARTICLES_MAX_AGE = 60
+API_LISTS_MAX_AGE = 300  # /api/sources and /api/tags change far less often
+API_STALE_WHILE_REVALIDATE = 3600
+COMPRESS_MIN_BYTES = 500
+
+# Bulk export settings
+EXPORT_FIELDS = ('id', 'title', 'link', 'summary', 'published', 'source', 'image_url', 'image_placeholder', 'tags', 'created_at')
+EXPORT_CHUNK_SIZE = 500  # Rows read per query while streaming an export
+
+image_cache = ImageCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES, IMAGE_CACHE_TTL, IMAGE_CACHE_NEGATIVE_TTL)
+
+# Counters and histograms, summed across every worker and ingest process that shares this file
+METRICS_DB = os.environ.get('METRICS_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'metrics.db'))
+metrics = Metrics(METRICS_DB)
+for name, kind, help_text in (
+    ('ingest_stage_seconds', 'histogram', 'Time spent per feed in each ingestion stage.'),
+    ('ingest_stage_errors_total', 'counter', 'Ingestion stage calls that raised.'),
+    ('feed_fetch_total', 'counter', 'Feed polls by outcome: fetched, not_modified (304), unchanged body or error.'),
+    ('image_enrichment_seconds', 'histogram', 'Article page image lookups by the method that found the image.'),
+    ('ingest_cache_total', 'counter', 'Ingestion cache lookups: known links and recorded image lookups.'),
+    ('ingest_duplicates_total', 'counter', 'New entries found to duplicate a stored article before enrichment, by match.'),
+    ('ingest_write_seconds', 'histogram', 'Time to store one batch of articles.'),
+    ('ingest_articles_total', 'counter', 'Articles handed to the writer, by outcome.'),
+    ('http_requests_total', 'counter', 'Requests served, by route and status.'),
+    ('http_request_seconds', 'histogram', 'Time to produce a response, by route.'),
+    ('articles_query_seconds', 'histogram', 'get_articles query time, by filter shape.'),
+    ('image_cache_total', 'counter', 'Image proxy cache lookups by kind (original or variant) and result.'),
+    ('image_upstream_seconds', 'histogram', 'Time for an image origin to answer, by status.'),
+    ('image_upstream_bytes_total', 'counter', 'Image bytes downloaded from origins.'),
+    ('export_rows_total', 'counter', 'Rows streamed by /api/export, by format.'),
+    ('outbound_requests_total', 'counter', 'Outbound requests per host, by status code, error, retried, fast_failed or circuit_opened.'),
+    ('outbound_request_seconds', 'histogram', 'Outbound request time per host, up to the response headers.'),
+):
+    metrics.describe(name, kind, help_text)
+
+poll_policy = PollPolicy(FEED_POLL_MIN, FEED_POLL_MAX, default_interval=INGEST_INTERVAL)
 
 # RSS feed URLs with specific handling rules
 FEEDS = {
@@ -69,6 +163,34 @@ FEEDS = {
     }
 }
 
+_outbound = None
+_outbound_lock = threading.Lock()
+
+def outbound_client():
+    """The client every feed, article page and image request shares for its keep-alive pools and per-host limits.
+    
+    Created on first use: importing requests is a large part of a cold
+    start, and most requests a web worker serves never leave the process.
+    """
+    global _outbound
+    if _outbound is None:
+        with _outbound_lock:
+            if _outbound is None:
+                from http_client import OutboundClient
+                _outbound = OutboundClient(
+                    concurrency=OUTBOUND_HOST_CONCURRENCY,
+                    rate=OUTBOUND_HOST_RATE,
+                    burst=OUTBOUND_HOST_BURST,
+                    retries=OUTBOUND_RETRIES,
+                    breaker_threshold=OUTBOUND_BREAKER_THRESHOLD,
+                    breaker_cooldown=OUTBOUND_BREAKER_COOLDOWN,
+                    max_hosts=OUTBOUND_MAX_HOSTS,
+                    metrics=metrics,
+                    # Publishers get their own series; anything else the image proxy fetches is 'other'
+                    metric_hosts={urllib.parse.urlsplit(feed['url']).hostname for feed in FEEDS.values()}
+                )
+    return _outbound
+
 def process_image_url(image_url, source):
     """Process and format image URLs based on source."""
     if not image_url:
@@ -123,65 +245,94 @@ def process_image_url(image_url, source):
     
     return image_url
 
-def fetch_article_image(url, selector=None):
-    """Fetch image URL from an article page."""
+def resolve_article_image(url, selector=None):
+    """Find the lead image on an article page.
+    
+    The page is streamed and parsed only up to the end of <head>, which is
+    where og:image and twitter:image live. Only pages without them are read
+    in full and searched with the source's selector, in the parse process pool.
+    
+    Returns an (image_url, method, status, error) tuple, where status is 200
+    when an image was found, 404 when the page has none, and otherwise the
+    error status of the page fetch.
+    """
+    from page_meta import read_head_image
+    
     try:
-        session = requests.Session()
-        response = session.get(url, timeout=10, headers={
+        with outbound_client().get(url, timeout=10, stream=True, headers={
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
-        })
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
+        }) as response:
+            if response.status_code >= 400:
+                logger.error(f"[FETCH] Article page returned {response.status_code}: {url}")
+                return None, None, response.status_code, f'Article page returned {response.status_code}'
+            
+            chunks = response.iter_content(chunk_size=16 * 1024)
+            method, image, html = read_head_image(chunks)
+            if image:
+                return ensure_absolute_url(image, url), method, 200, None
+            
+            size = len(html)
+            rest = []
+            for chunk in chunks:
+                size += len(chunk)
+                if size > ARTICLE_MAX_BYTES:
+                    break
+                rest.append(chunk)
+            html += b''.join(rest)
+    except Exception as e:
+        logger.error(f"[FETCH] Error fetching article image from {url}: {str(e)}")
+        return None, None, 502, f'Error fetching article page: {str(e)}'
+    
+    image_url, method = run_in_parse_pool(find_article_image, html, url, selector)
+    if not image_url:
+        return None, None, 404, 'No image found on article page'
+    return image_url, method, 200, None
+
+def find_article_image(html, url, selector=None):
+    """Find the image URL in a downloaded article page.
+    
+    CPU-bound, so the ingestion engine runs it in the parse process pool.
+    Returns an (image_url, method) tuple.
+    """
+    from bs4 import BeautifulSoup
+    
+    try:
+        soup = BeautifulSoup(html, 'lxml')
         
         # First try og:image meta tag
         og_image = soup.find('meta', property='og:image') or soup.find('meta', attrs={'name': 'og:image'})
         if og_image and og_image.get('content'):
-            return ensure_absolute_url(og_image.get('content'), url)
+            return ensure_absolute_url(og_image.get('content'), url), 'og:image'
         
         # Then try twitter:image
         twitter_image = soup.find('meta', property='twitter:image') or soup.find('meta', attrs={'name': 'twitter:image'})
         if twitter_image and twitter_image.get('content'):
-            return ensure_absolute_url(twitter_image.get('content'), url)
+            return ensure_absolute_url(twitter_image.get('content'), url), 'twitter:image'
+        
+        # Then the source's own selector
+        if selector:
+            for element in soup.select(selector):
+                src = element.get('content') if element.name == 'meta' else (element.get('src') or element.get('data-src'))
+                if src:
+                    return ensure_absolute_url(src, url), 'selector'
         
         # Try featured image
         featured_img = soup.find('img', class_=lambda x: x and ('featured' in x.lower() or 'hero' in x.lower()))
         if featured_img and featured_img.get('src'):
-            return ensure_absolute_url(featured_img.get('src'), url)
+            return ensure_absolute_url(featured_img.get('src'), url), 'featured'
         
         # Try first large image
         for img in soup.find_all('img'):
             src = img.get('src')
             if src and not any(x in src.lower() for x in ['avatar', 'logo', 'icon', 'banner', 'ad-']):
-                return ensure_absolute_url(src, url)
+                return ensure_absolute_url(src, url), 'page'
         
-        return None
+        return None, None
         
     except Exception as e:
-        logger.error(f"[FETCH] Error fetching article image from {url}: {str(e)}")
-        return None
-
-def validate_image_url(url):
-    """Validate that an image URL exists and returns a valid image."""
-    try:
-        # Only validate URLs from certain domains that we know are problematic
-        if not any(domain in url.lower() for domain in ['ablogtowatch.com', 'watchtime.com', 'fratellowatches.com']):
-            return True
-            
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-            'Accept': 'image/*',
-        }
-        
-        # Use HEAD request instead of GET for faster validation
-        response = requests.head(url, timeout=5, headers=headers, allow_redirects=True)
-        content_type = response.headers.get('content-type', '').lower()
-        
-        return response.status_code == 200 and ('image' in content_type or content_type.endswith('/webp'))
-        
-    except Exception as e:
-        return False
+        logger.error(f"[FETCH] Error parsing article image from {url}: {str(e)}")
+        return None, None
 
 def ensure_absolute_url(url, base_url):
     """Ensure a URL is absolute by combining it with a base URL if necessary."""
@@ -214,140 +365,140 @@ def ensure_absolute_url(url, base_url):
         logger.error(f"[URL] Error making URL absolute: {str(e)}")
         return None
 
-def extract_image_from_content(content):
-    if not content:
-        return None
-    soup = BeautifulSoup(content, 'html.parser')
-    
-    # Look for high-res images first
-    for img in soup.find_all('img'):
-        src = img.get('src', '')
-        # Skip advertisement images
-        if any(x in src.lower() for x in ['banner', 'ad-', 'advertisement']):
-            continue
-        if any(x in src.lower() for x in ['large', 'full', 'original', 'hero', 'featured', 'wp-content/uploads']):
-            return src
-    
-    # Then try data-src attribute (common for lazy-loaded images)
-    for img in soup.find_all('img'):
-        src = img.get('data-src') or img.get('data-lazy-src')
-        if src and not any(x in src.lower() for x in ['banner', 'ad-', 'advertisement']):
-            return src
-    
-    # Finally, just get the first non-advertisement image
-    for img in soup.find_all('img'):
-        src = img.get('src')
-        if src and not any(x in src.lower() for x in ['banner', 'ad-', 'advertisement']):
-            return src
-    return None
-
-def clean_html_content(content):
-    if not content:
-        return ''
-    soup = BeautifulSoup(content, 'html.parser')
-    # Remove all images from the summary
-    for img in soup.find_all('img'):
-        img.decompose()
-    # Get clean text
-    text = soup.get_text(strip=True)
-    # Limit to ~200 characters
+def summary_text(text):
+    """Limit summary text to ~200 characters."""
     return text[:200] + '...' if len(text) > 200 else text
 
-def parse_date(date_str):
-    """Parse a date string into a datetime object, handling multiple formats."""
-    if not date_str:
-        return datetime.now()
+def entry_content_html(entry):
+    """The full content HTML of a feed entry, if it has any."""
+    if hasattr(entry, 'content'):
+        return entry.content[0].value if isinstance(entry.content, list) else entry.content
+    elif isinstance(entry, dict) and 'content' in entry:
+        return entry['content'][0].get('value') if isinstance(entry['content'], list) else entry['content']
+    return None
+
+def parse_published(entry, source=None):
+    """Publish time of a feed entry as UTC epoch seconds, or None if it has no usable date.
     
-    try:
-        if isinstance(date_str, datetime):
-            return date_str
-            
-        if isinstance(date_str, str):
-            # Try parsing ISO format with timezone
-            try:
-                from dateutil import parser as date_parser
-                return date_parser.parse(date_str)
-            except:
-                pass
-            
-            # Try email format
+    feedparser has usually parsed the date already; the raw strings are only
+    parsed when it couldn't.
+    """
+    for field in ('published_parsed', 'updated_parsed'):
+        parsed = entry.get(field)
+        if parsed:
             try:
-                from email.utils import parsedate_to_datetime
-                return parsedate_to_datetime(date_str)
-            except:
+                return struct_to_timestamp(parsed)
+            except (ValueError, OverflowError):
                 pass
-            
-            # Try common formats without timezone
-            formats = [
-                '%Y-%m-%d %H:%M:%S',
-                '%Y-%m-%dT%H:%M:%S',
-                '%a, %d %b %Y %H:%M:%S'
-            ]
-            
-            for fmt in formats:
-                try:
-                    return datetime.strptime(date_str, fmt)
-                except:
-                    continue
-                    
-    except Exception as e:
-        # Instead of logging an error, just return current time
-        return datetime.now()
     
-    return datetime.now()
+    for field in ('published', 'updated'):
+        timestamp = parse_timestamp(entry.get(field), source)
+        if timestamp is not None:
+            return timestamp
+    return None
 
-@cache.memoize(timeout=1800)  # Cache for 30 minutes
-def fetch_feed(source, feed_config):
-    try:
-        feed_url = feed_config['url']
-        image_selector = feed_config.get('image_selector')
-        
-        # Get most recent article date for this source
-        conn = sqlite3.connect('articles.db')
+@functools.lru_cache(maxsize=4096)
+def format_published_day(day):
+    """Display date for a day number (epoch seconds // 86400)."""
+    return datetime.fromtimestamp(day * 86400, tz=timezone.utc).strftime('%B %d, %Y')
+
+def get_feed_validators(source, url):
+    """Load the stored conditional-GET validators for a feed source."""
+    with db.read_connection() as conn:
         c = conn.cursor()
-        c.execute('SELECT published FROM articles WHERE source = ? ORDER BY published DESC LIMIT 1', (source,))
+        c.execute('SELECT url, etag, last_modified, body_hash FROM feed_validators WHERE source = ?', (source,))
         row = c.fetchone()
-        conn.close()
-        
-        most_recent_date = parse_date(row[0]) if row else None
-        
-        session = requests.Session()
-        response = session.get(feed_url, timeout=15, headers={
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-            'Accept': 'application/rss+xml, application/xml'
-        })
-        response.raise_for_status()
-        
-        feed = feedparser.parse(response.text)
-        entries = []
-        
-        # Filter entries newer than most recent date
-        entries_to_process = []
-        for entry in feed.entries[:50]:  # Still check up to 50 entries
-            entry_date = parse_date(entry.published if hasattr(entry, 'published') else None)
-            if not most_recent_date or (entry_date and entry_date > most_recent_date):
-                entries_to_process.append(entry)
-        
-        if not entries_to_process:
-            logger.info(f"No new entries to process for {source}")
-            return []
-            
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(process_feed_entry, entry, source, image_selector) 
-                      for entry in entries_to_process]
-            entries = [result for future in futures 
-                      if (result := future.result()) is not None]
-        
-        logger.info(f"Successfully processed {len(entries)} new entries from {source}")
-        return entries
+    
+    # Validators recorded for a different URL say nothing about this one
+    if not row or row[0] != url:
+        return {}
+    return {'etag': row[1], 'last_modified': row[2], 'body_hash': row[3]}
+
+def save_feed_validators(source, url, validators):
+    """Persist conditional-GET validators for a feed source."""
+    try:
+        db.write(lambda conn: conn.execute('''
+            INSERT INTO feed_validators (source, url, etag, last_modified, body_hash, checked_at)
+            VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(source) DO UPDATE SET
+                url = excluded.url,
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                body_hash = excluded.body_hash,
+                checked_at = excluded.checked_at
+        ''', (source, url, validators.get('etag'), validators.get('last_modified'), validators.get('body_hash'))))
     except Exception as e:
-        logger.error(f"Error fetching feed {source}: {str(e)}")
-        return []
+        logger.error(f"[FEED] Error saving validators for {source}: {str(e)}")
+
+def fetch_feed_body(source, url, timeout=15):
+    """Conditionally fetch a feed.
+    
+    Returns a (body, validators) tuple. body is None when the feed is unchanged
+    since the last poll, either because the server answered 304 or because the
+    body hashes to the same value. The caller saves the validators once the
+    body has been processed.
+    """
+    stored = get_feed_validators(source, url)
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+        'Accept': 'application/rss+xml, application/xml'
+    }
+    if stored.get('etag'):
+        headers['If-None-Match'] = stored['etag']
+    if stored.get('last_modified'):
+        headers['If-Modified-Since'] = stored['last_modified']
+    
+    response = outbound_client().get(url, timeout=timeout, headers=headers)
+    
+    if response.status_code == 304:
+        logger.info(f"[FEED] {source} not modified (304)")
+        metrics.inc('feed_fetch_total', source=source, result='not_modified')
+        save_feed_validators(source, url, {
+            'etag': response.headers.get('ETag') or stored.get('etag'),
+            'last_modified': response.headers.get('Last-Modified') or stored.get('last_modified'),
+            'body_hash': stored.get('body_hash')
+        })
+        return None, stored
+    
+    response.raise_for_status()
+    
+    body = response.content
+    validators = {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'body_hash': hashlib.sha256(body).hexdigest()
+    }
+    
+    if validators['body_hash'] == stored.get('body_hash'):
+        logger.info(f"[FEED] {source} unchanged (same body hash)")
+        metrics.inc('feed_fetch_total', source=source, result='unchanged')
+        save_feed_validators(source, url, validators)
+        return None, validators
+    
+    metrics.inc('feed_fetch_total', source=source, result='fetched')
+    return body, validators
+
+def parse_feed_entries(source, body, image_selector=None):
+    """Parse a feed body into normalized entry dicts.
+    
+    Runs in the parse process pool, so it only uses images found in the feed
+    itself. Entries still missing an image are enriched from the article page
+    by the ingestion engine.
+    """
+    import feedparser
+    
+    feed = feedparser.parse(body)
+    entries = []
+    for entry in feed.entries[:50]:
+        feed_entry = process_feed_entry(entry, source, image_selector, fetch_page=False)
+        if feed_entry:
+            entries.append(feed_entry)
+    return entries
 
-def process_feed_entry(entry, source, image_selector):
-    """Process a single feed entry in parallel."""
+def process_feed_entry(entry, source, image_selector, fetch_page=True):
+    """Normalize a single feed entry."""
     try:
-        published = parse_date(entry.published if hasattr(entry, 'published') else None)
+        published = parse_published(entry, source)
         
         # Extract tags
         tags = []
@@ -363,27 +514,40 @@ def process_feed_entry(entry, source, image_selector):
         # Clean up tags
         tags = list(set(tag for tag in tags if tag and len(tag) < 50))
         
+        # Parse the entry's HTML once; feedparser often repeats the summary as the content
+        summary_html = entry.summary if hasattr(entry, 'summary') else ''
+        content_html = entry_content_html(entry)
+        summary = process_entry_html(summary_html)
+        content = summary if content_html == summary_html else process_entry_html(content_html)
+        
         # Get image URL
-        image_url = extract_image_from_entry(entry, image_selector)
+        image_url, image_method = extract_image_from_entry(entry, image_selector, fetch_page=fetch_page, content=content)
         
         # Create entry dict
         feed_entry = {
             'title': entry.title if hasattr(entry, 'title') else '',
             'link': entry.link if hasattr(entry, 'link') else '',
             'published': published,
-            'summary': clean_html_content(entry.summary if hasattr(entry, 'summary') else ''),
+            'summary': summary_text(summary.text),
             'image_url': image_url,
+            'image_method': image_method,
             'source': source,
             'tags': tags
         }
+        feed_entry['canonical_link'] = canonicalize_url(feed_entry['link'])
+        feed_entry['simhash'] = text_simhash(feed_entry['title'], feed_entry['summary'])
         
         return feed_entry if feed_entry['title'] and feed_entry['link'] else None
         
     except Exception:
         return None
 
-def extract_image_from_entry(entry, image_selector=None):
-    """Extract image URL from a feed entry."""
+def extract_image_from_entry(entry, image_selector=None, fetch_page=True, content=None):
+    """Extract image URL from a feed entry, falling back to the article page if fetch_page is set.
+    
+    content is the entry's processed content HTML, if the caller already has it.
+    Returns an (image_url, method) tuple, where method says where the image was found.
+    """
     try:
         # Handle both attribute and dictionary access for title
         title = entry.title if hasattr(entry, 'title') else entry.get('title', 'Unknown title')
@@ -391,7 +555,7 @@ def extract_image_from_entry(entry, image_selector=None):
         # Get base URL - handle both attribute and dictionary access
         base_url = entry.link if hasattr(entry, 'link') else entry.get('link')
         if not base_url:
-            return None
+            return None, None
             
         # Try media:content first (often has highest quality images)
         media_content = getattr(entry, 'media_content', None) or entry.get('media_content')
@@ -402,13 +566,13 @@ def extract_image_from_entry(entry, image_selector=None):
                     if url:
                         absolute_url = ensure_absolute_url(url, base_url)
                         if absolute_url:
-                            return absolute_url
+                            return absolute_url, 'media_content'
             elif isinstance(media_content, dict):
                 url = media_content.get('url')
                 if url:
                     absolute_url = ensure_absolute_url(url, base_url)
                     if absolute_url:
-                        return absolute_url
+                        return absolute_url, 'media_content'
         
         # Try media:thumbnail
         media_thumbnail = getattr(entry, 'media_thumbnail', None) or entry.get('media_thumbnail')
@@ -419,153 +583,875 @@ def extract_image_from_entry(entry, image_selector=None):
                     if url:
                         absolute_url = ensure_absolute_url(url, base_url)
                         if absolute_url:
-                            return absolute_url
+                            return absolute_url, 'media_thumbnail'
             elif isinstance(media_thumbnail, dict):
                 url = media_thumbnail.get('url')
                 if url:
                     absolute_url = ensure_absolute_url(url, base_url)
                     if absolute_url:
-                        return absolute_url
+                        return absolute_url, 'media_thumbnail'
         
         # Try content
-        content = None
-        if hasattr(entry, 'content'):
-            content = entry.content[0].value if isinstance(entry.content, list) else entry.content
-        elif isinstance(entry, dict) and 'content' in entry:
-            content = entry['content'][0].get('value') if isinstance(entry['content'], list) else entry['content']
-            
-        if content:
-            soup = BeautifulSoup(content, 'html.parser')
-            for img in soup.find_all('img'):
-                src = img.get('src')
-                if src and not any(x in src.lower() for x in ['avatar', 'logo', 'icon']):
-                    absolute_url = ensure_absolute_url(src, base_url)
-                    if absolute_url:
-                        return absolute_url
+        if content is None:
+            content = process_entry_html(entry_content_html(entry))
+        for image in content.images:
+            src = image['url']
+            if not src.startswith('data:') and not any(x in src.lower() for x in ['avatar', 'logo', 'icon']):
+                absolute_url = ensure_absolute_url(src, base_url)
+                if absolute_url:
+                    return absolute_url, 'content'
         
         # Finally try article page
-        image_url = fetch_article_image(base_url, image_selector)
+        if not fetch_page:
+            return None, None
+        image_url, method, _, _ = resolve_article_image(base_url, image_selector)
         if image_url:
-            absolute_url = ensure_absolute_url(image_url, base_url)
-            if absolute_url:
-                return absolute_url
+            return image_url, method
         
-        return None
+        return None, None
         
     except Exception as e:
         logger.error(f"[IMAGE] Error extracting image from entry {title}: {str(e)}")
-        return None
+        return None, None
 
-def get_articles(page=1, per_page=10, search='', source='', tag=''):
-    offset = (page - 1) * per_page
+def get_image_resolutions(links):
+    """Load recorded image lookups for the given article links.
     
-    base_query = "SELECT * FROM articles"
-    count_query = "SELECT COUNT(*) FROM articles"
-    params = []
+    Returns {link: row dict}, with 'fresh' set while the lookup is within
+    its TTL (or the negative TTL for failed lookups).
+    """
+    resolutions = {}
+    now = time.time()
+    with db.read_connection() as conn:
+        for i in range(0, len(links), 500):
+            chunk = links[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for row in conn.execute(
+                f'SELECT * FROM image_resolution WHERE link IN ({placeholders})', chunk
+            ):
+                resolution = dict(row)
+                ttl = IMAGE_RESOLUTION_TTL if resolution['status'] == 200 else IMAGE_RESOLUTION_NEGATIVE_TTL
+                resolution['fresh'] = now - resolution['resolved_at'] < ttl
+                resolutions[resolution['link']] = resolution
+    return resolutions
+
+def build_fts_query(search):
+    """Turn free text into an FTS5 query where every word must match as a prefix."""
+    terms = re.findall(r'\w+', search)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+def row_to_article(row):
+    """Convert an articles row into the dict used by templates and the API."""
+    article = dict(row)
+    article['published_date'] = format_published_day(article['published'] // 86400)
+    if article.get('snippet'):
+        # FTS5 marks matches with control characters; escape everything else
+        article['snippet'] = str(escape(article['snippet'])).replace('\x02', '<mark>').replace('\x03', '</mark>')
+    return article
+
+def encode_cursor(position):
+    """Encode a pagination position as an opaque URL-safe token."""
+    payload = json.dumps(position, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+def decode_cursor(token):
+    """Decode a token from encode_cursor, raising ValueError if it is malformed."""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except Exception:
+        raise ValueError(f"Invalid cursor: {token}")
+    if not isinstance(position, dict) or not (
+        (isinstance(position.get('published'), int) and isinstance(position.get('id'), int))
+        or isinstance(position.get('offset'), int)
+    ):
+        raise ValueError(f"Invalid cursor: {token}")
+    return position
+
+def search_articles(search, per_page=10, source='', tag='', offset=0):
+    """Full-text search ranked by BM25, with highlighted summary snippets.
     
-    conditions = []
-    if search:
-        conditions.append("(title LIKE ? OR summary LIKE ?)")
-        params.extend([f'%{search}%', f'%{search}%'])
+    Returns (articles, has_more).
+    """
+    fts_query = build_fts_query(search)
+    if not fts_query:
+        return [], False
+    
+    conditions = ["articles_fts MATCH ?"]
+    params = [fts_query]
     if source:
-        conditions.append("source = ?")
+        conditions.append("a.source = ?")
         params.append(source)
     if tag:
-        conditions.append("tags LIKE ?")
-        params.append(f'%{tag}%')
-    
-    if conditions:
-        where_clause = " WHERE " + " AND ".join(conditions)
-        base_query += where_clause
-        count_query += where_clause
+        conditions.append(
+            "a.id IN (SELECT article_id FROM article_tags"
+            " WHERE tag_id = (SELECT id FROM tags WHERE key = ?))"
+        )
+        params.append(tag_key(tag))
     
-    base_query += " ORDER BY published DESC LIMIT ? OFFSET ?"
-    query_params = params.copy()
-    query_params.extend([per_page, offset])
+    # Title matches count most, then tags, then the summary
+    query = (
+        "SELECT a.*, snippet(articles_fts, 1, char(2), char(3), '…', 16) AS snippet"
+        " FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid"
+        " WHERE " + " AND ".join(conditions) +
+        " ORDER BY bm25(articles_fts, 10.0, 1.0, 5.0) LIMIT ? OFFSET ?"
+    )
     
-    with sqlite3.connect('articles.db') as conn:
-        conn.row_factory = sqlite3.Row
+    with db.read_connection() as conn, metrics.timer('articles_query_seconds', shape='search'):
         cursor = conn.cursor()
         
-        # Get total count
-        cursor.execute(count_query, params)
-        total_count = cursor.fetchone()[0]
-        
-        # Get paginated articles
-        cursor.execute(base_query, query_params)
+        # Fetch one extra row to learn whether there is another page
+        cursor.execute(query, params + [per_page + 1, offset])
         rows = cursor.fetchall()
         
-        articles = []
-        for row in rows:
-            article = dict(row)
-            article['published_date'] = datetime.fromisoformat(article['published']).strftime('%B %d, %Y')
-            articles.append(article)
+        articles = [row_to_article(row) for row in rows[:per_page]]
+        return articles, len(rows) > per_page
+
+def get_articles(page=1, per_page=10, search='', source='', tag='', cursor=None):
+    """Fetch a page of articles, newest first.
+    
+    Returns (articles, next_cursor), where next_cursor is None on the last
+    page. Pass next_cursor back as cursor to continue; this keyset path is
+    served by the (published, id) indexes and is stable under inserts. page
+    is the offset-based compatibility path. Search results are ranked, so
+    their cursors carry an offset instead.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    
+    if search:
+        offset = position['offset'] if position and 'offset' in position else (page - 1) * per_page
+        articles, has_more = search_articles(search, per_page=per_page, source=source, tag=tag, offset=offset)
+        return articles, encode_cursor({'offset': offset + per_page}) if has_more else None
+    
+    # Each filter shape has its own (..., published DESC, id DESC) index
+    if tag:
+        query = (
+            "SELECT a.* FROM article_tags at JOIN articles a ON a.id = at.article_id"
+            " WHERE at.tag_id = (SELECT id FROM tags WHERE key = ?)"
+        )
+        params = [tag_key(tag)]
+        order_columns = "at.published, at.article_id"
+        if source:
+            query += " AND a.source = ?"
+            params.append(source)
+    else:
+        query = "SELECT * FROM articles WHERE 1 = 1"
+        params = []
+        order_columns = "published, id"
+        if source:
+            query += " AND source = ?"
+            params.append(source)
+    
+    if position and 'id' in position:
+        query += f" AND ({order_columns}) < (?, ?)"
+        params.extend([position['published'], position['id']])
+        offset = 0
+    else:
+        offset = (page - 1) * per_page
+    
+    sort_columns = ', '.join(f'{column} DESC' for column in order_columns.split(', '))
+    query += f" ORDER BY {sort_columns} LIMIT ? OFFSET ?"
+    params.extend([per_page + 1, offset])
+    
+    shape = 'tag' if tag else 'source' if source else 'all'
+    with db.read_connection() as conn, metrics.timer('articles_query_seconds', shape=shape):
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
         
-        return articles, total_count
+        articles = [row_to_article(row) for row in rows[:per_page]]
+    
+    next_cursor = None
+    if len(rows) > per_page:
+        last = articles[-1]
+        next_cursor = encode_cursor({'published': last['published'], 'id': last['id']})
+    return articles, next_cursor
+
+_data_version = (0.0, None)
+
+def get_data_version(max_age=0):
+    """(generation, changed_at) of the stored data, bumped by every write that changes what pages show.
+    
+    By default the row is read every time, which is one primary key lookup.
+    With max_age, a worker may reuse the value it last read for that many
+    seconds; only answering conditional requests does that, since it sends
+    no content that could be stale.
+    """
+    global _data_version
+    expires, version = _data_version
+    if max_age and version is not None and time.monotonic() < expires:
+        return version
+    with db.read_connection() as conn:
+        row = conn.execute('SELECT generation, changed_at FROM data_generation WHERE id = 1').fetchone()
+    version = (row[0], row[1]) if row else (0, None)
+    _data_version = (time.monotonic() + max_age, version)
+    return version
+
+def get_data_generation():
+    """Current data generation, bumped by every write that changes what pages show."""
+    return get_data_version()[0]
+
+def bump_data_generation(conn):
+    """Invalidate cached responses once the current write transaction commits."""
+    conn.execute('UPDATE data_generation SET generation = generation + 1, changed_at = ? WHERE id = 1', (int(time.time()),))
+
+def normalized_query():
+    """The request's non-empty query args, sorted, as a query string."""
+    return urllib.parse.urlencode(sorted(
+        (key, value) for key, value in request.args.items(multi=True) if value.strip()
+    ))
+
+def response_cache_key(*args, **kwargs):
+    """Cache key for a view: the data generation, path and normalized query args."""
+    return f'view/{get_data_generation()}{request.path}?{normalized_query()}'
+
+def is_cacheable_response(rv):
+    # Views return a (body, status) tuple for errors
+    return not isinstance(rv, tuple)
+
+def cached_response(view):
+    """Cache a view's response across workers until the data generation changes."""
+    return cache.cached(make_cache_key=response_cache_key, response_filter=is_cacheable_response)(view)
+
+def api_validators(max_age):
+    """Give a JSON view an ETag and Last-Modified from the data version, and answer
+    conditional requests with 304 before the view runs.
+    
+    The ETag is weak, since the same data is sent gzip- or brotli-encoded.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            def validators(version):
+                generation, changed_at = version
+                etag = hashlib.sha1(
+                    f'{SCHEMA_VERSION}/{generation}{request.path}?{normalized_query()}'.encode('utf-8')
+                ).hexdigest()[:20]
+                return etag, changed_at
+            
+            etag, changed_at = validators(get_data_version(max_age=DATA_VERSION_TTL))
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = bool(changed_at and request.if_modified_since
+                                    and changed_at <= request.if_modified_since.timestamp())
+            if not_modified:
+                response = Response(status=304)
+            else:
+                # Label the body with the generation it is cached under, not the remembered one
+                etag, changed_at = validators(get_data_version())
+                response = app.make_response(view(*args, **kwargs))
+            
+            if response.status_code in (200, 304):
+                response.set_etag(etag, weak=True)
+                if changed_at:
+                    response.last_modified = changed_at
+                response.headers['Cache-Control'] = (
+                    f'public, max-age={max_age}, stale-while-revalidate={API_STALE_WHILE_REVALIDATE}'
+                )
+            else:
+                response.headers['Cache-Control'] = 'no-store'
+            return response
+        return wrapper
+    return decorator
+
+def load_brotli():
+    """brotli is optional; without it responses are only gzip-compressed."""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+@functools.lru_cache(maxsize=256)
+def compress_body(body, encoding):
+    """Compress a response body, remembering recent results since API bodies repeat until the data changes."""
+    if encoding == 'br':
+        return load_brotli().compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+@app.after_request
+def compress_api_response(response):
+    """gzip or brotli-encode JSON API responses when the client accepts it."""
+    if (not request.path.startswith('/api/') or response.status_code != 200
+            or response.mimetype != 'application/json' or response.direct_passthrough
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    encodings = ['br', 'gzip'] if load_brotli() is not None else ['gzip']
+    encoding = request.accept_encodings.best_match(encodings)
+    if not encoding:
+        return response
+    
+    response.set_data(compress_body(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+@app.context_processor
+def inject_image_widths():
+    return {'image_widths': IMAGE_VARIANT_WIDTHS}
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    # Label by URL rule rather than path, so every article URL doesn't become its own series
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.inc('http_requests_total', route=route, method=request.method, status=response.status_code)
+    if 'request_started' in g:
+        metrics.observe('http_request_seconds', time.perf_counter() - g.request_started, route=route)
+    return response
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/')
+@cached_response
 def index():
     page = request.args.get('page', 1, type=int)
-    articles, total_count = get_articles(page=page)
+    articles, next_cursor = get_articles(page=page)
     return render_template('index.html', 
                          entries=articles,
                          page=page,
-                         total_pages=(total_count + 29) // 30,
-                         total_count=total_count)
+                         next_cursor=next_cursor)
 
 @app.route('/source/<source>')
+@cached_response
 def source_page(source):
     page = request.args.get('page', 1, type=int)
-    articles, total_count = get_articles(source=source, page=page)
+    articles, next_cursor = get_articles(source=source, page=page)
     return render_template('index.html', 
                          entries=articles,
                          source=source,
                          page=page,
-                         total_pages=(total_count + 29) // 30,
-                         total_count=total_count)
+                         next_cursor=next_cursor)
 
 @app.route('/tag/<tag>')
+@cached_response
 def tag_page(tag):
     page = request.args.get('page', 1, type=int)
-    articles, total_count = get_articles(tag=tag, page=page)
+    articles, next_cursor = get_articles(tag=tag, page=page)
     return render_template('index.html', 
                          entries=articles,
                          tag=tag,
                          page=page,
-                         total_pages=(total_count + 29) // 30,
-                         total_count=total_count)
+                         next_cursor=next_cursor)
 
 @app.route('/search')
+@cached_response
 def search():
     query = request.args.get('q', '').strip()
     if not query:
         return redirect('/')
         
     page = request.args.get('page', 1, type=int)
-    articles, total_count = get_articles(search=query, page=page)
+    articles, next_cursor = get_articles(search=query, page=page)
     return render_template('index.html', 
                          entries=articles,
                          search=query,
                          page=page,
-                         total_pages=(total_count + 29) // 30,
-                         total_count=total_count)
+                         next_cursor=next_cursor)
 
 @app.route('/api/articles')
+@api_validators(API_ARTICLES_MAX_AGE)
+@cached_response
 def api_articles():
     page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     per_page = 10
     search = request.args.get('search', '')
     source = request.args.get('source', '')
     tag = request.args.get('tag', '')
     
-    articles, total_count = get_articles(page=page, per_page=per_page, search=search, source=source, tag=tag)
+    try:
+        articles, next_cursor = get_articles(page=page, per_page=per_page, search=search,
+                                             source=source, tag=tag, cursor=cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     return jsonify({
         'articles': articles,
         'page': page,
-        'has_more': len(articles) == per_page and (page * per_page) < total_count
+        'has_more': next_cursor is not None,
+        'next_cursor': next_cursor
     })
 
+def iter_export_chunks(fields, since=None, since_field='published', source='', tag=''):
+    """Yield lists of export rows, oldest first, EXPORT_CHUNK_SIZE at a time.
+    
+    Each chunk is its own keyset query on the index for the filter shape,
+    so memory stays constant and no read transaction is held open while
+    the client consumes the stream.
+    """
+    if since_field == 'created_at':
+        order_columns = ('a.created_at', 'a.id')
+    elif tag:
+        order_columns = ('at.published', 'at.article_id')
+    else:
+        order_columns = ('a.published', 'a.id')
+    
+    query = 'SELECT ' + ', '.join(f'a.{field}' for field in fields)
+    query += f', {order_columns[0]} AS _key1, {order_columns[1]} AS _key2 FROM articles a'
+    conditions = []
+    params = []
+    if tag:
+        query += ' JOIN article_tags at ON at.article_id = a.id'
+        conditions.append('at.tag_id = (SELECT id FROM tags WHERE key = ?)')
+        params.append(tag_key(tag))
+    if source:
+        conditions.append('a.source = ?')
+        params.append(source)
+    if since is not None:
+        conditions.append(f'{order_columns[0]} >= ?')
+        if since_field == 'created_at':
+            # created_at is SQLite's CURRENT_TIMESTAMP text, in UTC
+            params.append(datetime.fromtimestamp(since, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S'))
+        else:
+            params.append(since)
+    
+    position = None
+    while True:
+        chunk_conditions = list(conditions)
+        chunk_params = list(params)
+        if position is not None:
+            chunk_conditions.append(f'({order_columns[0]}, {order_columns[1]}) > (?, ?)')
+            chunk_params.extend(position)
+        chunk_query = query
+        if chunk_conditions:
+            chunk_query += ' WHERE ' + ' AND '.join(chunk_conditions)
+        chunk_query += f' ORDER BY {order_columns[0]}, {order_columns[1]} LIMIT ?'
+        
+        with db.read_connection() as conn:
+            rows = conn.execute(chunk_query, chunk_params + [EXPORT_CHUNK_SIZE]).fetchall()
+        if not rows:
+            return
+        position = (rows[-1]['_key1'], rows[-1]['_key2'])
+        yield [[row[field] for field in fields] for row in rows]
+        if len(rows) < EXPORT_CHUNK_SIZE:
+            return
+
+@app.route('/api/export')
+def api_export():
+    """Stream every matching article as NDJSON or CSV, oldest first.
+    
+    fields= selects columns (comma-separated), since= (epoch seconds or a
+    date) only returns articles published, or with since_field=created_at
+    stored, at or after that time, and source= and tag= filter as elsewhere.
+    Epoch seconds need at least 10 digits, so a compact date like 20250101
+    is rejected rather than read as a time in 1970.
+    """
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in ('ndjson', 'csv'):
+        return jsonify({'error': f'Unsupported format: {fmt}'}), 400
+    
+    fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()] or list(EXPORT_FIELDS)
+    unknown = [field for field in fields if field not in EXPORT_FIELDS]
+    if unknown:
+        return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+    
+    since_field = request.args.get('since_field', 'published')
+    if since_field not in ('published', 'created_at'):
+        return jsonify({'error': f'Unsupported since_field: {since_field}'}), 400
+    since = request.args.get('since', '').strip()
+    if since:
+        if since.isdigit() and len(since) < 10:
+            return jsonify({'error': f"Ambiguous since: {since}; use epoch seconds (10+ digits) or YYYY-MM-DD"}), 400
+        since = int(since) if since.isdigit() else parse_timestamp(since)
+        if since is None:
+            return jsonify({'error': f"Invalid since: {request.args['since']}"}), 400
+    else:
+        since = None
+    
+    chunks = iter_export_chunks(fields, since=since, since_field=since_field,
+                                source=request.args.get('source', ''), tag=request.args.get('tag', ''))
+    
+    def generate():
+        if fmt == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(fields)
+        for rows in chunks:
+            if fmt == 'csv':
+                writer.writerows(rows)
+                body = buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            else:
+                body = ''.join(json.dumps(dict(zip(fields, row)), ensure_ascii=False) + '\n' for row in rows)
+            metrics.inc('export_rows_total', len(rows), format=fmt)
+            yield body
+        if fmt == 'csv' and buffer.tell():
+            yield buffer.getvalue()
+    
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(generate(), mimetype=mimetype, headers={'Cache-Control': 'no-store'})
+
+class ImageFetchError(Exception):
+    """An upstream image could not be proxied; status is what we answer with."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class ImageFlight:
+    """One in-progress upstream fetch that concurrent requests for the same image wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry = None
+        self.error = None
+
+_image_flights = {}
+_image_flights_lock = threading.Lock()
+
+def join_image_flight(key):
+    """Return (flight, is_leader); the leader fetches, everyone else waits."""
+    with _image_flights_lock:
+        flight = _image_flights.get(key)
+        if flight is not None:
+            return flight, False
+        flight = _image_flights[key] = ImageFlight()
+        return flight, True
+
+def finish_image_flight(key, flight, entry=None, error=None):
+    """Publish the outcome of a fetch to waiting requests.
+
+    Finishing without an entry or error means the download was abandoned,
+    and waiters fetch the image themselves.
+    """
+    if flight.done.is_set():
+        return
+    flight.entry = entry
+    flight.error = error
+    with _image_flights_lock:
+        if _image_flights.get(key) is flight:
+            del _image_flights[key]
+    flight.done.set()
+
+def image_request_headers(url):
+    """Headers for fetching an image from its origin."""
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+        'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.9'
+    }
+
+    # Parse the URL to get the domain
+    domain = urllib.parse.urlparse(url).netloc
+
+    # Add domain-specific headers
+    if 'cdn.shopify.com' in domain:
+        # For Shopify CDN, use Windup Watch Shop as referer
+        headers['Referer'] = 'https://windupwatchshop.com/'
+        headers['Origin'] = 'https://windupwatchshop.com'
+    else:
+        headers['Referer'] = f'https://{domain}/'
+        headers['Origin'] = f'https://{domain}'
+    return headers
+
+def open_upstream_image(url, key, stale=None):
+    """Start fetching an image from its origin.
+
+    Returns either a cache entry (the stale copy was revalidated, or is served
+    because the origin is down) or an open streaming response for a new body.
+    Failures are cached for a short while and raised as ImageFetchError.
+    """
+    import requests
+    
+    headers = image_request_headers(url)
+    if stale and stale['status'] == 200:
+        if stale['etag']:
+            headers['If-None-Match'] = stale['etag']
+        if stale['last_modified']:
+            headers['If-Modified-Since'] = stale['last_modified']
+    else:
+        stale = None
+
+    # Special handling for Fratello images
+    fetch_url = url
+    if 'fratellowatches.com' in urllib.parse.urlparse(url).netloc:
+        fetch_url = encode_fratello_url(url)
+
+    started = time.perf_counter()
+    try:
+        response = outbound_client().get(fetch_url, headers=headers, timeout=10, stream=True, allow_redirects=True)
+    except requests.exceptions.RequestException as e:
+        metrics.observe('image_upstream_seconds', time.perf_counter() - started, status='error')
+        logger.error(f"[PROXY] Request error for {url}: {str(e)}")
+        if stale:
+            return stale
+        image_cache.put_failure(key, 502, f'Error fetching image: {str(e)}')
+        raise ImageFetchError(502, f'Error fetching image: {str(e)}')
+    metrics.observe('image_upstream_seconds', time.perf_counter() - started, status=response.status_code)
+
+    if response.status_code == 304 and stale:
+        response.close()
+        return image_cache.revalidated(key, response.headers.get('ETag'), response.headers.get('Last-Modified')) or stale
+
+    error = None
+    content_type = response.headers.get('Content-Type', '')
+    content_length = response.headers.get('Content-Length', '')
+    if response.status_code >= 400:
+        logger.error(f"[PROXY] Upstream returned {response.status_code} for {url}")
+        if stale and response.status_code >= 500:
+            response.close()
+            return stale
+        error = ImageFetchError(502, f'Error fetching image: upstream returned {response.status_code}')
+    elif not content_type.startswith('image/'):
+        # Verify content type is an image
+        logger.error(f"[PROXY] Invalid content type: {content_type}")
+        error = ImageFetchError(400, f'Invalid content type: {content_type}')
+    elif content_length.isdigit() and int(content_length) > IMAGE_MAX_BYTES:
+        logger.error(f"[PROXY] Image too large ({content_length} bytes): {url}")
+        error = ImageFetchError(502, f'Image too large: {content_length} bytes')
+
+    if error:
+        response.close()
+        image_cache.put_failure(key, error.status, str(error))
+        raise error
+    return response
+
+def stream_image_into_cache(url, key, response, flight):
+    """Yield an upstream image to the client while writing it into the cache."""
+    digest = hashlib.sha256()
+    size = 0
+    temp_file = image_cache.new_temp_file()
+    try:
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            size += len(chunk)
+            if size > IMAGE_MAX_BYTES:
+                logger.error(f"[PROXY] Image too large (over {IMAGE_MAX_BYTES} bytes): {url}")
+                error = ImageFetchError(502, f'Image too large: over {IMAGE_MAX_BYTES} bytes')
+                image_cache.put_failure(key, error.status, str(error))
+                finish_image_flight(key, flight, error=error)
+                return
+            temp_file.write(chunk)
+            digest.update(chunk)
+            metrics.inc('image_upstream_bytes_total', len(chunk))
+            yield chunk
+
+        temp_file.close()
+        entry = image_cache.put(
+            key, temp_file.name, digest.hexdigest(), size, response.headers.get('Content-Type'),
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified')
+        )
+        finish_image_flight(key, flight, entry=entry)
+    finally:
+        response.close()
+        temp_file.close()
+        if os.path.exists(temp_file.name):
+            os.unlink(temp_file.name)
+        # Client went away or the download failed; let waiters fetch for themselves
+        finish_image_flight(key, flight)
+
+def load_pillow():
+    """Pillow is optional; without it the proxy only serves original images."""
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return None
+    return Image, ImageOps
+
+def ensure_cached_image(url, key):
+    """Make sure an original image is in the cache, fetching it without a client attached."""
+    entry = image_cache.get(key)
+    metrics.inc('image_cache_total', kind='original', result=image_cache_result(entry))
+    if entry and entry['fresh']:
+        if entry['status'] != 200:
+            raise ImageFetchError(entry['status'], entry['error'])
+        return entry
+    
+    for _ in range(2):
+        flight, leader = join_image_flight(key)
+        if leader:
+            break
+        if not flight.done.wait(IMAGE_FLIGHT_TIMEOUT):
+            raise ImageFetchError(504, 'Timed out waiting for image')
+        if flight.error:
+            raise flight.error
+        if flight.entry:
+            return flight.entry
+    else:
+        raise ImageFetchError(503, 'Image fetch in progress')
+    
+    try:
+        result = open_upstream_image(url, key, stale=entry)
+    except Exception as e:
+        finish_image_flight(key, flight, error=e if isinstance(e, ImageFetchError) else None)
+        raise
+    if isinstance(result, dict):
+        finish_image_flight(key, flight, entry=result)
+        return result
+    
+    for _ in stream_image_into_cache(url, key, result, flight):
+        pass
+    if flight.error:
+        raise flight.error
+    if not flight.entry:
+        raise ImageFetchError(502, 'Error fetching image')
+    return flight.entry
+
+def variant_key(key, width, fmt):
+    """Cache key for a resized variant; normalized URLs never contain a fragment."""
+    return f'{key}#w={width or ""}&fmt={fmt}'
+
+def ensure_image_variant(url, key, width, fmt):
+    """Return the cache entry for a resized/transcoded variant, generating it if needed.
+    
+    Falls back to the original image when Pillow is missing or can't decode
+    it; a failed conversion is remembered for IMAGE_CACHE_NEGATIVE_TTL so it
+    isn't retried on every request.
+    """
+    vkey = variant_key(key, width, fmt)
+    entry = image_cache.get(vkey)
+    metrics.inc('image_cache_total', kind='variant', result=image_cache_result(entry))
+    if entry and entry['fresh']:
+        if entry['status'] == 200:
+            return entry
+        return ensure_cached_image(url, key)
+    
+    original = ensure_cached_image(url, key)
+    pillow = load_pillow()
+    if pillow is None:
+        return original
+    Image, ImageOps = pillow
+    
+    temp_file = None
+    try:
+        with Image.open(original['path']) as img:
+            if width:
+                img.draft('RGB', (width, width * 4))
+            img = ImageOps.exif_transpose(img)
+            if width:
+                img.thumbnail((width, width * 4))  # Only ever scales down
+            if fmt == 'jpeg' and img.mode != 'RGB':
+                img = img.convert('RGB')
+            elif img.mode not in ('RGB', 'RGBA'):
+                img = img.convert('RGBA')
+            
+            with image_cache.new_temp_file() as temp_file:
+                if fmt == 'webp':
+                    img.save(temp_file, format='WEBP', quality=80, method=4)
+                else:
+                    img.save(temp_file, format='JPEG', quality=82, optimize=True, progressive=True)
+    except Exception as e:
+        logger.error(f"[PROXY] Error generating {fmt} variant of {url}: {str(e)}")
+        if temp_file is not None:
+            try:
+                os.unlink(temp_file.name)
+            except FileNotFoundError:
+                pass
+        image_cache.put_failure(vkey, 415, str(e))
+        return original
+    
+    digest = hashlib.sha256()
+    with open(temp_file.name, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    size = os.path.getsize(temp_file.name)
+    return image_cache.put(vkey, temp_file.name, digest.hexdigest(), size, f'image/{fmt}')
+
+def image_placeholder_color(path):
+    """Average color of an image as #rrggbb, for painting the card before the image loads."""
+    pillow = load_pillow()
+    if pillow is None:
+        return None
+    Image, _ = pillow
+    with Image.open(path) as img:
+        img.draft('RGB', (64, 64))
+        red, green, blue = img.convert('RGB').resize((1, 1), Image.BOX).getpixel((0, 0))
+    return f'#{red:02x}{green:02x}{blue:02x}'
+
+def save_image_placeholders(conn, placeholders):
+    """Store (link, placeholder) pairs for a batch of articles with one generation bump."""
+    conn.executemany('UPDATE articles SET image_placeholder = ? WHERE link = ?',
+                     [(placeholder, link) for link, placeholder in placeholders])
+    bump_data_generation(conn)
+
+def warm_image_variants(image_url):
+    """Pre-generate the standard variants for a newly stored article's image.
+    
+    Returns its placeholder colour, or None if the image couldn't be used.
+    """
+    try:
+        key = normalize_url(image_url)
+        original = ensure_cached_image(image_url, key)
+        for width in IMAGE_VARIANT_WIDTHS:
+            ensure_image_variant(image_url, key, width, 'webp')
+        return image_placeholder_color(original['path'])
+    except ImageFetchError as e:
+        logger.info(f"[PROXY] Skipping variants for {image_url}: {str(e)}")
+    except Exception as e:
+        logger.error(f"[PROXY] Error warming variants for {image_url}: {str(e)}")
+    return None
+
+def save_warmed_placeholders(links, futures):
+    """Wait for a batch's variants, then store its placeholders in one write."""
+    placeholders = [(link, future.result()) for link, future in zip(links, futures) if future.result()]
+    if placeholders:
+        db.write(save_image_placeholders, placeholders)
+
+_variant_pool = None
+_variant_pool_lock = threading.Lock()
+_variant_batches = set()
+
+def schedule_image_variants(articles):
+    """Queue variant generation for stored articles in the background."""
+    global _variant_pool
+    if not IMAGE_VARIANTS_PREGENERATE or load_pillow() is None:
+        return
+    articles = [article for article in articles if article['image_url']]
+    if not articles:
+        return
+    with _variant_pool_lock:
+        if _variant_pool is None:
+            _variant_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='image-variants')
+        futures = [_variant_pool.submit(warm_image_variants, article['image_url']) for article in articles]
+        # Queued after the batch's own jobs, so it never holds a worker they are waiting for
+        batch = _variant_pool.submit(save_warmed_placeholders, [article['link'] for article in articles], futures)
+        _variant_batches.add(batch)
+    batch.add_done_callback(_variant_batches.discard)
+
+def wait_for_image_variants():
+    """Block until every queued variant batch has stored its placeholders."""
+    with _variant_pool_lock:
+        batches = list(_variant_batches)
+    wait(batches)
+
+def send_cached_image(entry):
+    """Send a cached image with a strong ETag, answering If-None-Match with 304."""
+    response = send_file(
+        entry['path'],
+        mimetype=entry['content_type'],
+        etag=entry['digest'],
+        max_age=IMAGE_CACHE_TTL,
+        conditional=True
+    )
+    add_image_cors_headers(response)
+    return response
+
+def add_image_cors_headers(response):
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    response.headers['Access-Control-Allow-Methods'] = 'GET'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+
+def image_error_response(error):
+    return str(error), error.status, {'Cache-Control': f'max-age={IMAGE_CACHE_NEGATIVE_TTL}'}
+
+def image_cache_result(entry):
+    if entry is None:
+        return 'miss'
+    if entry['status'] != 200:
+        return 'negative' if entry['fresh'] else 'miss'
+    return 'hit' if entry['fresh'] else 'stale'
+
 @app.route('/proxy/image')
 def proxy_image():
     url = request.args.get('url')
@@ -573,65 +1459,64 @@ def proxy_image():
         logger.error("[PROXY] No URL provided to proxy")
         return 'No URL provided', 400
     
+    width = request.args.get('w', type=int)
+    fmt = request.args.get('fmt')
+    if width is not None and width not in IMAGE_VARIANT_WIDTHS:
+        return f'Unsupported width: {width}', 400
+    if fmt is not None and fmt not in IMAGE_VARIANT_FORMATS:
+        return f'Unsupported format: {fmt}', 400
+    
     try:
-        # Common headers for all requests
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-            'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Cache-Control': 'no-cache',
-            'Pragma': 'no-cache'
-        }
+        key = normalize_url(url)
+        if width or fmt:
+            return send_cached_image(ensure_image_variant(url, key, width, fmt or 'webp'))
         
-        # Parse the URL to get the domain
-        parsed_url = urllib.parse.urlparse(url)
-        domain = parsed_url.netloc
+        entry = image_cache.get(key)
+        metrics.inc('image_cache_total', kind='original', result=image_cache_result(entry))
         
-        # Add domain-specific headers
-        if 'cdn.shopify.com' in domain:
-            # For Shopify CDN, use Windup Watch Shop as referer
-            headers['Referer'] = 'https://windupwatchshop.com/'
-            headers['Origin'] = 'https://windupwatchshop.com'
-        else:
-            headers['Referer'] = f'https://{domain}/'
-            headers['Origin'] = f'https://{domain}'
-        
-        # Special handling for Fratello images
-        if 'fratellowatches.com' in domain:
-            url = encode_fratello_url(url)
+        if entry and entry['fresh']:
+            if entry['status'] != 200:
+                return image_error_response(ImageFetchError(entry['status'], entry['error']))
+            return send_cached_image(entry)
         
-        # Make the request
-        response = requests.get(url, headers=headers, timeout=10, stream=True, allow_redirects=True)
-        response.raise_for_status()
+        flight, leader = join_image_flight(key)
+        if not leader:
+            # Another request is already fetching this image; wait for it
+            if not flight.done.wait(IMAGE_FLIGHT_TIMEOUT):
+                return 'Timed out waiting for image', 504
+            if flight.error:
+                return image_error_response(flight.error)
+            if flight.entry:
+                return send_cached_image(flight.entry)
+            flight, leader = join_image_flight(key)
+            if not leader:
+                return 'Image fetch in progress', 503, {'Retry-After': '1'}
         
-        # Verify content type is an image
-        content_type = response.headers.get('Content-Type', '')
-        if not content_type.startswith('image/'):
-            logger.error(f"[PROXY] Invalid content type: {content_type}")
-            return f'Invalid content type: {content_type}', 400
-        
-        # Create file-like object of the image
-        image_io = BytesIO(response.content)
-        
-        # Send the image with proper headers
-        response = send_file(
-            image_io,
-            mimetype=content_type,
-            as_attachment=False,
-            download_name=None,
-            max_age=3600  # Cache for 1 hour
-        )
+        try:
+            result = open_upstream_image(url, key, stale=entry)
+        except Exception as e:
+            finish_image_flight(key, flight, error=e if isinstance(e, ImageFetchError) else None)
+            raise
         
-        # Add CORS headers
-        response.headers['Access-Control-Allow-Origin'] = '*'
-        response.headers['Access-Control-Allow-Methods'] = 'GET'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+        if isinstance(result, dict):
+            finish_image_flight(key, flight, entry=result)
+            return send_cached_image(result)
         
+        headers = {'Cache-Control': f'public, max-age={IMAGE_CACHE_TTL}'}
+        if result.headers.get('Content-Length') and not result.headers.get('Content-Encoding'):
+            headers['Content-Length'] = result.headers['Content-Length']
+        response = Response(
+            stream_image_into_cache(url, key, result, flight),
+            mimetype=result.headers.get('Content-Type'),
+            headers=headers
+        )
+        # Runs even if the body is never iterated, so waiters are always released
+        response.call_on_close(lambda: (result.close(), finish_image_flight(key, flight)))
+        add_image_cors_headers(response)
         return response
-        
-    except requests.exceptions.RequestException as e:
-        logger.error(f"[PROXY] Request error for {url}: {str(e)}")
-        return f'Error fetching image: {str(e)}', 502
+    
+    except ImageFetchError as e:
+        return image_error_response(e)
     except Exception as e:
         logger.error(f"[PROXY] Error proxying image {url}: {str(e)}")
         return f'Error proxying image: {str(e)}', 500
@@ -662,16 +1547,23 @@ def encode_fratello_url(url):
         parsed.fragment
     ))
 
+# Bump whenever create_schema changes, so workers migrate on their first request
+SCHEMA_VERSION = 6
+
 def init_db():
-    conn = sqlite3.connect('articles.db')
+    """Create the schema and migrate existing databases."""
+    db.write(create_schema)
+
+def create_schema(conn):
     c = conn.cursor()
+    previous_version = c.execute('PRAGMA user_version').fetchone()[0]
     c.execute('''
         CREATE TABLE IF NOT EXISTS articles (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             title TEXT NOT NULL,
             link TEXT UNIQUE NOT NULL,
             summary TEXT,
-            published TIMESTAMP NOT NULL,
+            published INTEGER NOT NULL,
             source TEXT NOT NULL,
             image_url TEXT,
             tags TEXT,
@@ -679,9 +1571,159 @@ def init_db():
         )
     ''')
     # Create indexes for faster querying
-    c.execute('CREATE INDEX IF NOT EXISTS idx_published ON articles(published DESC)')
-    c.execute('CREATE INDEX IF NOT EXISTS idx_source ON articles(source)')
-    c.execute('CREATE INDEX IF NOT EXISTS idx_tags ON articles(tags)')
+    # Keyset pagination indexes, one per filter shape (tag pages use article_tags)
+    c.execute('CREATE INDEX IF NOT EXISTS idx_published_id ON articles(published DESC, id DESC)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_source_published_id ON articles(source, published DESC, id DESC)')
+    # Incremental exports by when we stored an article
+    c.execute('CREATE INDEX IF NOT EXISTS idx_created_at_id ON articles(created_at, id)')
+    c.execute('DROP INDEX IF EXISTS idx_published')
+    c.execute('DROP INDEX IF EXISTS idx_source')
+    # Tag filters use article_tags; the old index on the raw column only slowed writes
+    c.execute('DROP INDEX IF EXISTS idx_tags')
+    
+    # Add columns introduced after the initial schema
+    columns = {row[1] for row in c.execute('PRAGMA table_info(articles)')}
+    if 'content_hash' not in columns:
+        c.execute('ALTER TABLE articles ADD COLUMN content_hash TEXT')
+    if 'image_placeholder' not in columns:
+        c.execute('ALTER TABLE articles ADD COLUMN image_placeholder TEXT')
+    if 'canonical_link' not in columns:
+        c.execute('ALTER TABLE articles ADD COLUMN canonical_link TEXT')
+    if 'simhash' not in columns:
+        c.execute('ALTER TABLE articles ADD COLUMN simhash INTEGER')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_canonical_link ON articles(canonical_link)')
+    
+    # How each article's image was found, shared by every worker so restarts don't re-scrape pages
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS image_resolution (
+            link TEXT PRIMARY KEY,
+            image_url TEXT,
+            method TEXT,
+            status INTEGER NOT NULL,
+            error TEXT,
+            resolved_at REAL NOT NULL
+        )
+    ''')
+    
+    # Full-text search index over title, summary and tags, kept in sync by triggers
+    c.execute("SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'")
+    fts_exists = c.fetchone() is not None
+    c.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+            title, summary, tags,
+            content='articles',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    ''')
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+            INSERT INTO articles_fts (rowid, title, summary, tags)
+            VALUES (new.id, new.title, new.summary, new.tags);
+        END
+    ''')
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+            INSERT INTO articles_fts (articles_fts, rowid, title, summary, tags)
+            VALUES ('delete', old.id, old.title, old.summary, old.tags);
+        END
+    ''')
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, summary, tags ON articles BEGIN
+            INSERT INTO articles_fts (articles_fts, rowid, title, summary, tags)
+            VALUES ('delete', old.id, old.title, old.summary, old.tags);
+            INSERT INTO articles_fts (rowid, title, summary, tags)
+            VALUES (new.id, new.title, new.summary, new.tags);
+        END
+    ''')
+    if not fts_exists:
+        c.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+    
+    # Normalized tags: a dictionary keyed by case-folded name plus a join table
+    c.execute("SELECT 1 FROM sqlite_master WHERE name = 'article_tags'")
+    article_tags_exists = c.fetchone() is not None
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS tags (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            key TEXT UNIQUE NOT NULL
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS article_tags (
+            tag_id INTEGER NOT NULL REFERENCES tags(id),
+            article_id INTEGER NOT NULL REFERENCES articles(id),
+            published INTEGER,
+            PRIMARY KEY (tag_id, article_id)
+        ) WITHOUT ROWID
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_article_tags_article ON article_tags(article_id)')
+    # published is copied from articles so tag pages paginate on an index
+    article_tags_columns = {row[1] for row in c.execute('PRAGMA table_info(article_tags)')}
+    if 'published' not in article_tags_columns:
+        c.execute('ALTER TABLE article_tags ADD COLUMN published INTEGER')
+        c.execute('UPDATE article_tags SET published = (SELECT published FROM articles WHERE id = article_id)')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_article_tags_tag_published
+        ON article_tags(tag_id, published DESC, article_id DESC)
+    ''')
+    if previous_version < 3:
+        # published used to be text in whatever format the feed used; store UTC epoch seconds
+        c.execute("SELECT id, title, summary, published, source, tags, created_at FROM articles WHERE typeof(published) = 'text'")
+        updates = []
+        for row in c.fetchall():
+            article = dict(row)
+            article['published'] = parse_timestamp(article['published']) or parse_timestamp(article['created_at']) or 0
+            updates.append((article['published'], article_content_hash(article), article['id']))
+        c.executemany('UPDATE articles SET published = ?, content_hash = ? WHERE id = ?', updates)
+        c.execute('UPDATE article_tags SET published = (SELECT published FROM articles WHERE id = article_id)')
+    if not article_tags_exists:
+        # One-off migration of the comma-separated tags column
+        c.execute('SELECT id, tags, published FROM articles WHERE tags IS NOT NULL')
+        sync_article_tags(conn, {article_id: (tags, published) for article_id, tags, published in c.fetchall()})
+    
+    # Near-duplicate lookup: articles sharing any band of their SimHash are compared in full
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS article_simhash_bands (
+            band INTEGER NOT NULL,
+            value INTEGER NOT NULL,
+            article_id INTEGER NOT NULL REFERENCES articles(id),
+            PRIMARY KEY (band, value, article_id)
+        ) WITHOUT ROWID
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_simhash_bands_article ON article_simhash_bands(article_id)')
+    # Links that duplicate a stored article; they are never stored or enriched themselves
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS article_aliases (
+            id INTEGER PRIMARY KEY,
+            link TEXT UNIQUE NOT NULL,
+            article_id INTEGER NOT NULL REFERENCES articles(id),
+            reason TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    if previous_version < 6:
+        # Existing duplicates stay as they are; only new arrivals are collapsed
+        c.execute('SELECT id, link, title, summary FROM articles WHERE canonical_link IS NULL')
+        updates = [
+            (canonicalize_url(link), text_simhash(title, summary), article_id)
+            for article_id, link, title, summary in c.fetchall()
+        ]
+        c.executemany('UPDATE articles SET canonical_link = ?, simhash = ? WHERE id = ?', updates)
+        sync_simhash_bands(conn, {article_id: simhash for _, simhash, article_id in updates})
+    
+    # Conditional-GET validators for each feed source
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS feed_validators (
+            source TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            body_hash TEXT,
+            checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
     
     # Update any existing entries with old source name
     c.execute('''
@@ -690,180 +1732,933 @@ def init_db():
         WHERE source LIKE '%Fratello%' AND source != 'Fratello'
     ''')
     
-    conn.commit()
-    conn.close()
+    # Adaptive polling state for each feed source
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS feed_schedule (
+            source TEXT PRIMARY KEY,
+            next_poll_at REAL NOT NULL,
+            poll_interval REAL,
+            last_success_at REAL,
+            last_published_at REAL,
+            error_streak INTEGER NOT NULL DEFAULT 0,
+            gaps TEXT
+        )
+    ''')
+    
+    # Part of every response cache key; bumped on startup too, since a deploy can change pages
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS data_generation (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL,
+            changed_at INTEGER
+        )
+    ''')
+    # When the generation last changed, for Last-Modified on API responses
+    if 'changed_at' not in {row[1] for row in c.execute('PRAGMA table_info(data_generation)')}:
+        c.execute('ALTER TABLE data_generation ADD COLUMN changed_at INTEGER')
+    c.execute('INSERT OR IGNORE INTO data_generation (id, generation) VALUES (1, 0)')
+    bump_data_generation(conn)
+    
+    c.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
 
-def store_article(entry, source):
-    """Store an article in the database."""
-    conn = sqlite3.connect('articles.db')
-    c = conn.cursor()
-    try:
-        # Extract and clean tags
-        tags = []
-        entry_tags = entry.get('tags', [])
-        
-        # Handle both list and string inputs
-        if isinstance(entry_tags, str):
-            tags = [tag.strip() for tag in entry_tags.split(',') if tag.strip()]
-        elif isinstance(entry_tags, list):
-            for tag in entry_tags:
-                if isinstance(tag, str) and tag.strip():
-                    tags.append(tag.strip())
-                elif isinstance(tag, dict):
-                    if tag.get('term'):
-                        tags.append(str(tag['term']).strip())
-                    if tag.get('label'):
-                        tags.append(str(tag['label']).strip())
-        
-        # Clean up tags and remove duplicates
-        tags = list(set(tag for tag in tags if tag and len(tag) < 50))
-        tags_str = ','.join(tags) if tags else None
-        
-        # Extract and process the image URL
-        image_url = extract_image_from_entry(entry)
-        if image_url:
-            image_url = process_image_url(image_url, source)
-        
-        # Convert entry from feed format to database format
-        article_data = {
-            'title': entry.get('title', ''),
-            'link': entry.get('link', ''),
-            'summary': entry.get('summary', ''),
-            'published': entry.get('published', datetime.now()),
-            'source': entry.get('source', source),
-            'image_url': image_url,
-            'tags': tags_str
-        }
+class KnownLinks:
+    """In-memory set of stored article links.
+    
+    Loaded incrementally by id, so links stored by other workers are picked
+    up on the next refresh, and updated directly whenever we store articles.
+    """
+    
+    def __init__(self):
+        self.links = set()
+        self.max_id = 0
+        self.max_alias_id = 0
+        self.lock = threading.Lock()
+    
+    def refresh(self):
+        """Load links stored since the last refresh, including links recorded as duplicates."""
+        with db.read_connection() as conn:
+            c = conn.cursor()
+            c.execute('SELECT id, link FROM articles WHERE id > ?', (self.max_id,))
+            rows = c.fetchall()
+            c.execute('SELECT id, link FROM article_aliases WHERE id > ?', (self.max_alias_id,))
+            alias_rows = c.fetchall()
         
-        # Only store if we have required fields
-        if article_data['title'] and article_data['link']:
-            c.execute('''
-                INSERT OR REPLACE INTO articles 
-                (title, link, summary, published, source, image_url, tags)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                article_data['title'],
-                article_data['link'],
-                article_data['summary'],
-                article_data['published'],
-                article_data['source'],
-                article_data['image_url'],
-                article_data['tags']
-            ))
-            conn.commit()
-    except Exception as e:
-        logger.error(f"[STORE] Error storing article {entry.get('title', 'Unknown')}: {str(e)}")
-    finally:
-        conn.close()
-
-def fetch_all_feeds():
-    """Fetch all RSS feeds and return a dictionary of source to entries."""
-    feeds = {
-        'ABTW': 'https://www.ablogtowatch.com/feed/',
-        'Fratello': 'https://www.fratellowatches.com/feed/',
-        'Worn & Wound': 'https://wornandwound.com/feed/',
-        'Monochrome': 'https://monochrome-watches.com/feed/',
-        'Hodinkee': 'https://www.hodinkee.com/feed'
+        with self.lock:
+            for article_id, link in rows:
+                self.links.add(link)
+                self.max_id = max(self.max_id, article_id)
+            for alias_id, link in alias_rows:
+                self.links.add(link)
+                self.max_alias_id = max(self.max_alias_id, alias_id)
+    
+    def add(self, links):
+        with self.lock:
+            self.links.update(links)
+    
+    def __contains__(self, link):
+        return link in self.links
+
+known_links = KnownLinks()
+
+def normalize_article(entry, source):
+    """Convert a feed entry into an articles row, or None if required fields are missing."""
+    # Extract and clean tags
+    tags = []
+    entry_tags = entry.get('tags', [])
+    
+    # Handle both list and string inputs
+    if isinstance(entry_tags, str):
+        tags = [tag.strip() for tag in entry_tags.split(',') if tag.strip()]
+    elif isinstance(entry_tags, list):
+        for tag in entry_tags:
+            if isinstance(tag, str) and tag.strip():
+                tags.append(tag.strip())
+            elif isinstance(tag, dict):
+                if tag.get('term'):
+                    tags.append(str(tag['term']).strip())
+                if tag.get('label'):
+                    tags.append(str(tag['label']).strip())
+    
+    # Clean up tags and remove duplicates
+    tags = sorted(set(tag for tag in tags if tag and len(tag) < 50))
+    tags_str = ','.join(tags) if tags else None
+    
+    # Process the image URL resolved during ingestion
+    image_url = entry.get('image_url')
+    if image_url:
+        image_url = process_image_url(image_url, source)
+    
+    article = {
+        'title': entry.get('title', ''),
+        'link': entry.get('link', ''),
+        'summary': entry.get('summary', ''),
+        'published': entry.get('published'),
+        'source': entry.get('source', source),
+        'image_url': image_url,
+        'tags': tags_str,
+        'image_resolution': entry.get('image_resolution')
     }
+    if not article['title'] or not article['link']:
+        return None
+    
+    article['canonical_link'] = entry.get('canonical_link') or canonicalize_url(article['link'])
+    article['simhash'] = entry['simhash'] if 'simhash' in entry else text_simhash(article['title'], article['summary'])
+    
+    article['content_hash'] = article_content_hash(article)
+    return article
+
+def article_content_hash(article):
+    """Hash of the fields that decide whether a stored article needs rewriting.
+    
+    The image is compared separately, so a feed without images never
+    overwrites one we found on the article page.
+    """
+    return hashlib.sha256('\x1f'.join(
+        str(article[field] or '') for field in ('title', 'summary', 'published', 'source', 'tags')
+    ).encode('utf-8')).hexdigest()
+
+def tag_key(tag):
+    """Normalized lookup key for a tag name."""
+    return tag.strip().casefold()
+
+def sync_article_tags(conn, tags_by_article):
+    """Replace the article_tags rows for the given {article_id: (tags_str, published)} mapping."""
+    if not tags_by_article:
+        return
+    
+    names = {}
+    for tags_str, _ in tags_by_article.values():
+        for name in (tags_str or '').split(','):
+            if name.strip():
+                names.setdefault(tag_key(name), name.strip())
+    
+    # The first spelling we see becomes the display name
+    conn.executemany(
+        'INSERT INTO tags (name, key) VALUES (?, ?) ON CONFLICT(key) DO NOTHING',
+        [(name, key) for key, name in names.items()]
+    )
+    tag_ids = {}
+    keys = list(names)
+    for i in range(0, len(keys), 500):
+        chunk = keys[i:i + 500]
+        placeholders = ','.join('?' * len(chunk))
+        tag_ids.update((key, tag_id) for tag_id, key in conn.execute(
+            f'SELECT id, key FROM tags WHERE key IN ({placeholders})', chunk
+        ))
+    
+    conn.executemany('DELETE FROM article_tags WHERE article_id = ?', [(article_id,) for article_id in tags_by_article])
+    conn.executemany(
+        'INSERT OR IGNORE INTO article_tags (tag_id, article_id, published) VALUES (?, ?, ?)',
+        [
+            (tag_ids[tag_key(name)], article_id, published)
+            for article_id, (tags_str, published) in tags_by_article.items()
+            for name in (tags_str or '').split(',')
+            if name.strip()
+        ]
+    )
+
+def sync_simhash_bands(conn, simhashes):
+    """Replace the article_simhash_bands rows for the given {article_id: simhash} mapping."""
+    if not simhashes:
+        return
+    conn.executemany('DELETE FROM article_simhash_bands WHERE article_id = ?', [(article_id,) for article_id in simhashes])
+    conn.executemany(
+        'INSERT OR IGNORE INTO article_simhash_bands (band, value, article_id) VALUES (?, ?, ?)',
+        [
+            (band, value, article_id)
+            for article_id, simhash in simhashes.items() if simhash is not None
+            for band, value in simhash_bands(simhash)
+        ]
+    )
+
+def find_stored_duplicates(conn, articles):
+    """Match articles not stored under their own link against stored ones.
+    
+    articles maps link to a dict with canonical_link and simhash. Articles
+    with the same canonical link match first; the rest are looked up by
+    SimHash band, and candidates within the distance threshold match.
+    Returns {link: (article_id, reason)}, pointing at the oldest match.
+    """
+    duplicates = {}
+    by_canonical = {}
+    for link, article in articles.items():
+        by_canonical.setdefault(article['canonical_link'], []).append(link)
+    keys = list(by_canonical)
+    for i in range(0, len(keys), 500):
+        chunk = keys[i:i + 500]
+        placeholders = ','.join('?' * len(chunk))
+        for canonical_link, article_id in conn.execute(
+            f'SELECT canonical_link, MIN(id) FROM articles WHERE canonical_link IN ({placeholders}) GROUP BY canonical_link',
+            chunk
+        ):
+            for link in by_canonical[canonical_link]:
+                duplicates[link] = (article_id, 'canonical_link')
+    
+    bands = {}
+    for link, article in articles.items():
+        if link not in duplicates and article['simhash'] is not None:
+            for band in simhash_bands(article['simhash']):
+                bands.setdefault(band, []).append(link)
+    values_by_band = {}
+    for band, value in bands:
+        values_by_band.setdefault(band, []).append(value)
+    candidates = {}
+    # One query per band, so each is a range of seeks on the (band, value) primary key
+    for band, values in values_by_band.items():
+        for i in range(0, len(values), 500):
+            chunk = values[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for value, article_id, simhash in conn.execute(
+                'SELECT b.value, a.id, a.simhash FROM article_simhash_bands b JOIN articles a ON a.id = b.article_id'
+                f' WHERE b.band = ? AND b.value IN ({placeholders})',
+                [band] + chunk
+            ):
+                for link in bands[(band, value)]:
+                    candidates.setdefault(link, {})[article_id] = simhash
+    for link, stored in candidates.items():
+        matches = [article_id for article_id, simhash in stored.items()
+                   if is_near_duplicate(articles[link]['simhash'], simhash)]
+        if matches:
+            duplicates[link] = (min(matches), 'simhash')
+    return duplicates
+
+def find_batch_duplicates(articles):
+    """Match new articles against earlier ones in the same batch.
+    
+    Returns {link: (first_link, reason)}.
+    """
+    duplicates = {}
+    first_by_canonical = {}
+    by_band = {}
+    for link, article in articles.items():
+        first = first_by_canonical.get(article['canonical_link'])
+        if first:
+            duplicates[link] = (first, 'canonical_link')
+            continue
+        article_bands = simhash_bands(article['simhash']) if article['simhash'] is not None else []
+        match = next((
+            other for band in article_bands for other in by_band.get(band, [])
+            if is_near_duplicate(article['simhash'], articles[other]['simhash'])
+        ), None)
+        if match:
+            duplicates[link] = (match, 'simhash')
+            continue
+        first_by_canonical[article['canonical_link']] = link
+        for band in article_bands:
+            by_band.setdefault(band, []).append(link)
+    return duplicates
+
+def store_articles(entries):
+    """Store a batch of entries in a single transaction.
     
-    results = {}
-    for source, url in feeds.items():
+    Rows whose content hash and image are unchanged are not written at all,
+    and new entries that duplicate a stored story are only recorded as aliases.
+    Returns a dict of inserted/updated/unchanged/duplicates/failed counts.
+    """
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'duplicates': 0, 'failed': 0}
+    
+    # Normalize before taking the write lock so the transaction stays short
+    articles = {}
+    for entry in entries:
         try:
-            logger.info(f"Fetching feed for {source} from {url}")
-            feed = feedparser.parse(url)
-            if feed.get('status') == 200 and feed.entries:
-                results[source] = feed.entries
-                logger.info(f"Successfully fetched {len(feed.entries)} entries from {source}")
-            else:
-                logger.warning(f"Failed to fetch feed for {source}: Status {feed.get('status', 'unknown')}")
+            article = normalize_article(entry, entry.get('source'))
         except Exception as e:
-            logger.error(f"Error fetching feed for {source}: {str(e)}")
-            results[source] = []
+            logger.error(f"[STORE] Error normalizing article {entry.get('title', 'Unknown')}: {str(e)}")
+            article = None
+        if article:
+            articles[article['link']] = article
+        else:
+            counts['failed'] += 1
+    
+    if not articles:
+        return counts
+    
+    try:
+        written_counts, changed = db.write(write_articles, articles)
+        counts.update(written_counts)
+        known_links.add(articles)
+        schedule_image_variants(changed)
+    except Exception as e:
+        logger.error(f"[STORE] Error storing batch of {len(articles)} articles: {str(e)}")
+        counts['failed'] += len(articles)
+    
+    return counts
+
+def write_articles(conn, articles):
+    """Upsert normalized articles on the writer connection.
+    
+    Returns (counts, changed): inserted/updated/unchanged/duplicates counts
+    and the articles that were actually written.
+    """
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'duplicates': 0}
+    
+    existing = {}
+    links = list(articles)
+    for i in range(0, len(links), 500):
+        chunk = links[i:i + 500]
+        placeholders = ','.join('?' * len(chunk))
+        for link, content_hash, image_url, published in conn.execute(
+            f'SELECT link, content_hash, image_url, published FROM articles WHERE link IN ({placeholders})', chunk
+        ):
+            existing[link] = (content_hash, image_url, published)
+    
+    # New links may be the same story under another URL, or syndicated by another source
+    new_articles = {link: article for link, article in articles.items() if link not in existing}
+    known_aliases = set()
+    new_links = list(new_articles)
+    for i in range(0, len(new_links), 500):
+        chunk = new_links[i:i + 500]
+        placeholders = ','.join('?' * len(chunk))
+        known_aliases.update(link for link, in conn.execute(
+            f'SELECT link FROM article_aliases WHERE link IN ({placeholders})', chunk
+        ))
+    stored_duplicates = find_stored_duplicates(
+        conn, {link: article for link, article in new_articles.items() if link not in known_aliases}
+    )
+    batch_duplicates = find_batch_duplicates({
+        link: article for link, article in new_articles.items()
+        if link not in known_aliases and link not in stored_duplicates
+    })
+    duplicate_links = known_aliases | set(stored_duplicates) | set(batch_duplicates)
+    
+    # Lookups are remembered whether or not the article itself changed
+    now = time.time()
+    conn.executemany('''
+        INSERT INTO image_resolution (link, image_url, method, status, error, resolved_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(link) DO UPDATE SET
+            image_url = excluded.image_url,
+            method = excluded.method,
+            status = excluded.status,
+            error = excluded.error,
+            resolved_at = excluded.resolved_at
+    ''', [
+        (link, *article['image_resolution'], now)
+        for link, article in articles.items()
+        if article['image_resolution']
+    ])
+    
+    changed = []
+    for link, article in articles.items():
+        if link in duplicate_links:
+            counts['duplicates'] += 1
+            continue
+        if article['published'] is None:
+            # Undated entries keep the time we first saw them
+            article['published'] = existing[link][2] if link in existing else int(now)
+        if link not in existing:
+            counts['inserted'] += 1
+        elif existing[link][0] != article['content_hash'] or (
+            article['image_url'] and existing[link][1] != article['image_url']
+        ):
+            counts['updated'] += 1
+        else:
+            counts['unchanged'] += 1
+            continue
+        changed.append(article)
+    
+    if not changed:
+        save_article_aliases(conn, stored_duplicates, batch_duplicates, {})
+        return counts, changed
+    
+    conn.executemany('''
+        INSERT INTO articles
+        (title, link, summary, published, source, image_url, tags, content_hash, canonical_link, simhash)
+        VALUES (:title, :link, :summary, :published, :source, :image_url, :tags, :content_hash, :canonical_link, :simhash)
+        ON CONFLICT(link) DO UPDATE SET
+            title = excluded.title,
+            summary = excluded.summary,
+            published = excluded.published,
+            source = excluded.source,
+            image_url = COALESCE(excluded.image_url, articles.image_url),
+            tags = excluded.tags,
+            content_hash = excluded.content_hash,
+            canonical_link = excluded.canonical_link,
+            simhash = excluded.simhash
+        WHERE articles.content_hash IS NOT excluded.content_hash
+           OR (excluded.image_url IS NOT NULL AND articles.image_url IS NOT excluded.image_url)
+    ''', changed)
+    
+    changed_links = [article['link'] for article in changed]
+    tags_by_article = {}
+    ids = {}
+    for i in range(0, len(changed_links), 500):
+        chunk = changed_links[i:i + 500]
+        placeholders = ','.join('?' * len(chunk))
+        for article_id, link in conn.execute(
+            f'SELECT id, link FROM articles WHERE link IN ({placeholders})', chunk
+        ):
+            ids[link] = article_id
+            tags_by_article[article_id] = (articles[link]['tags'], articles[link]['published'])
+    sync_article_tags(conn, tags_by_article)
+    sync_simhash_bands(conn, {article_id: articles[link]['simhash'] for link, article_id in ids.items()})
+    save_article_aliases(conn, stored_duplicates, batch_duplicates, ids)
+    bump_data_generation(conn)
+    
+    return counts, changed
+
+def save_article_aliases(conn, stored_duplicates, batch_duplicates, ids):
+    """Record duplicate links against the article they repeat.
+    
+    batch_duplicates point at links written in this transaction, which ids
+    maps to their article ids.
+    """
+    conn.executemany(
+        'INSERT INTO article_aliases (link, article_id, reason) VALUES (?, ?, ?) ON CONFLICT(link) DO NOTHING',
+        [(link, article_id, reason) for link, (article_id, reason) in stored_duplicates.items()]
+        + [(link, ids[first], reason) for link, (first, reason) in batch_duplicates.items() if first in ids]
+    )
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+def run_in_parse_pool(func, *args):
+    """Run a CPU-bound parsing function in the shared process pool."""
+    global _parse_pool
+    if INGEST_PARSE_PROCESSES <= 0:
+        return func(*args)
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ProcessPoolExecutor(max_workers=INGEST_PARSE_PROCESSES)
+    return _parse_pool.submit(func, *args).result()
+
+class PendingFeeds:
+    """Parsed feeds whose validators and poll result wait until their entries are stored.
+    
+    Saving an ETag or body hash before the entries are written would make
+    the next poll skip a feed whose entries never made it to the database.
+    """
+    
+    def __init__(self):
+        self.feeds = {}
+        self.lock = threading.Lock()
     
-    return results
+    def add(self, source, validators, published, count):
+        with self.lock:
+            self.feeds[source] = {'validators': validators, 'published': published, 'remaining': count, 'ok': True}
+    
+    def stored(self, sources, ok):
+        """Count a written batch holding {source: entry count}.
+        
+        Returns (source, feed) for every feed that now has no entries left
+        to write; feed['ok'] is False if any of its batches failed.
+        """
+        finished = []
+        with self.lock:
+            for source, count in sources.items():
+                feed = self.feeds.get(source)
+                if feed is None:
+                    continue
+                feed['remaining'] -= count
+                feed['ok'] = feed['ok'] and ok
+                if feed['remaining'] <= 0:
+                    finished.append((source, self.feeds.pop(source)))
+        return finished
+    
+    def abandon(self):
+        """Feeds with entries that never reached the writer, which are forgotten."""
+        with self.lock:
+            abandoned, self.feeds = list(self.feeds), {}
+        return abandoned
+
+pending_feeds = PendingFeeds()
+
+def finish_feed(source, feed):
+    """Save a feed's validators and reschedule it once all of its entries are stored."""
+    if feed['ok']:
+        save_feed_validators(source, FEEDS[source]['url'], feed['validators'])
+        record_feed_poll(source, published=feed['published'])
+    else:
+        # Leave the old validators, so the next poll fetches and stores the entries again
+        record_feed_poll(source, failed=True)
+
+def ingest_fetch(source):
+    """Pipeline stage: conditionally download a feed."""
+    feed_url = FEEDS[source]['url']
+    try:
+        with metrics.timer('ingest_stage_seconds', stage='fetch', source=source):
+            body, validators = fetch_feed_body(source, feed_url)
+    except Exception:
+        metrics.inc('feed_fetch_total', source=source, result='error')
+        metrics.inc('ingest_stage_errors_total', stage='fetch', source=source)
+        record_feed_poll(source, failed=True)
+        raise
+    if body is None:
+        record_feed_poll(source)
+        return []
+    return [(source, body, validators)]
+
+def ingest_parse(job):
+    """Pipeline stage: parse a feed body and flag entries we have already stored."""
+    source, body, validators = job
+    image_selector = FEEDS[source].get('image_selector')
+    
+    try:
+        with metrics.timer('ingest_stage_seconds', stage='parse', source=source):
+            entries = run_in_parse_pool(parse_feed_entries, source, body, image_selector)
+    except Exception:
+        metrics.inc('ingest_stage_errors_total', stage='parse', source=source)
+        record_feed_poll(source, failed=True)
+        raise
+    
+    resolutions = get_image_resolutions([entry['link'] for entry in entries if not entry['image_url']])
+    new_entries = {entry['link']: entry for entry in entries if entry['link'] not in known_links}
+    duplicates = {}
+    if new_entries:
+        with db.read_connection() as conn:
+            duplicates = find_stored_duplicates(conn, new_entries)
+    for entry in entries:
+        entry['known'] = entry['link'] in known_links
+        metrics.inc('ingest_cache_total', cache='known_links', source=source, result='hit' if entry['known'] else 'miss')
+        if entry['link'] in duplicates:
+            # The writer records it as an alias; there is no card to find an image for
+            entry['duplicate_of'], reason = duplicates[entry['link']]
+            metrics.inc('ingest_duplicates_total', source=source, reason=reason)
+            continue
+        if entry['image_url']:
+            # The feed had an image, so there's no page lookup to remember
+            continue
+        
+        resolution = resolutions.get(entry['link'])
+        metrics.inc('ingest_cache_total', cache='image_resolution', source=source,
+                    result='miss' if resolution is None else 'hit' if resolution['fresh'] else 'expired')
+        if resolution and resolution['fresh']:
+            entry['image_url'] = resolution['image_url']
+        else:
+            # Stored articles with no recorded lookup are left alone so a deploy doesn't
+            # re-scrape everything; recorded lookups are retried once they expire
+            entry['resolve_image'] = resolution is not None or not entry['known']
+    
+    feed = {'validators': validators, 'published': [entry['published'] for entry in entries], 'ok': True}
+    if entries:
+        pending_feeds.add(source, feed['validators'], feed['published'], len(entries))
+    else:
+        finish_feed(source, feed)
+    new_count = sum(1 for entry in entries if not entry['known'])
+    logger.info(f"Parsed {len(entries)} entries from {source} ({new_count} new, {len(duplicates)} duplicates)")
+    return entries
+
+def needs_enrichment(entry):
+    """Whether an entry still needs its image looked up on the article page."""
+    return not entry['image_url'] and entry.get('resolve_image', False)
+
+def ingest_enrich(entry):
+    """Pipeline stage: find an image on the article page for entries without one.
+    
+    Entries we already store, or whose lookup is still cached, pass straight
+    through to the writer, which only rewrites them if their content changed.
+    """
+    if needs_enrichment(entry):
+        image_selector = FEEDS[entry['source']].get('image_selector')
+        with metrics.timer('image_enrichment_seconds', source=entry['source']) as labels:
+            entry['image_resolution'] = resolve_article_image(entry['link'], image_selector)
+            status = entry['image_resolution'][2]
+            labels['method'] = entry['image_resolution'][1] or ('none' if status == 404 else 'error')
+        entry['image_url'] = entry['image_resolution'][0]
+    return [entry]
+
+def ingest_write(entries):
+    """Pipeline stage: store a batch of entries."""
+    with metrics.timer('ingest_write_seconds'):
+        counts = store_articles(entries)
+    for result, count in counts.items():
+        if count:
+            metrics.inc('ingest_articles_total', count, result=result)
+    logger.info(f"[STORE] Stored batch of {len(entries)}: " + ", ".join(f"{k} {v}" for k, v in counts.items()))
+    
+    sources = {}
+    for entry in entries:
+        sources[entry['source']] = sources.get(entry['source'], 0) + 1
+    for source, feed in pending_feeds.stored(sources, ok=counts['failed'] == 0):
+        finish_feed(source, feed)
+    return [counts]
+
+def build_ingestion_pipeline():
+    """Build the fetch -> parse -> enrich -> write ingestion engine."""
+    return Pipeline([
+        Stage('fetch', ingest_fetch, workers=4, queue_size=len(FEEDS), uses_budget=True),
+        Stage('parse', ingest_parse, workers=max(1, INGEST_PARSE_PROCESSES), queue_size=8),
+        Stage('enrich', ingest_enrich, workers=INGEST_CONCURRENCY, queue_size=200, uses_budget=needs_enrichment),
+        Stage('write', ingest_write, workers=1, queue_size=200, batch_size=100)
+    ], concurrency=INGEST_CONCURRENCY)
 
-def background_feed_update():
-    """Background thread function to periodically update feeds."""
+def record_feed_poll(source, published=None, failed=False):
+    """Reschedule a feed after polling it; published holds the entry dates when it was parsed."""
+    now = time.time()
+    timestamps = None
+    if published is not None:
+        # Future dates would make a feed look busier than it is
+        timestamps = [min(p, now) for p in published if p is not None]
+    try:
+        db.write(update_feed_schedule, source, timestamps, failed)
+    except Exception as e:
+        logger.error(f"[SCHEDULE] Error rescheduling {source}: {str(e)}")
+
+def update_feed_schedule(conn, source, published, failed):
+    """Work out a feed's next poll time from its cadence and error streak."""
+    now = time.time()
+    row = conn.execute('SELECT * FROM feed_schedule WHERE source = ?', (source,)).fetchone()
+    gaps = json.loads(row['gaps']) if row and row['gaps'] else []
+    last_published = row['last_published_at'] if row else None
+    last_success = row['last_success_at'] if row else None
+    error_streak = row['error_streak'] if row else 0
+    
+    if failed:
+        error_streak += 1
+    else:
+        error_streak = 0
+        last_success = now
+        if published:
+            # An unchanged feed (published is None) keeps its previous cadence
+            gaps = poll_policy.gaps(published) or gaps
+            last_published = max(published)
+    
+    interval = poll_policy.interval(poll_policy.cadence(gaps, last_published, now), error_streak)
+    conn.execute('''
+        INSERT INTO feed_schedule
+        (source, next_poll_at, poll_interval, last_success_at, last_published_at, error_streak, gaps)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(source) DO UPDATE SET
+            next_poll_at = excluded.next_poll_at,
+            poll_interval = excluded.poll_interval,
+            last_success_at = excluded.last_success_at,
+            last_published_at = excluded.last_published_at,
+            error_streak = excluded.error_streak,
+            gaps = excluded.gaps
+    ''', (source, now + interval, interval, last_success, last_published, error_streak, json.dumps(gaps)))
+    logger.info(f"[SCHEDULE] Next poll of {source} in {interval / 60:.0f} min" + (f" (error streak {error_streak})" if error_streak else ""))
+
+def claim_due_feeds(conn, sources):
+    """Reserve the feeds that are due for polling, so other processes skip them."""
+    now = time.time()
+    scheduled = dict(conn.execute('SELECT source, next_poll_at FROM feed_schedule').fetchall())
+    due = [source for source in sources if scheduled.get(source, 0) <= now]
+    conn.executemany('''
+        INSERT INTO feed_schedule (source, next_poll_at) VALUES (?, ?)
+        ON CONFLICT(source) DO UPDATE SET next_poll_at = excluded.next_poll_at
+    ''', [(source, now + FEED_POLL_LEASE) for source in due])
+    return due
+
+def seconds_until_next_poll(sources):
+    """How long the scheduler can sleep; it wakes at least every minute to notice new schedules."""
+    with db.read_connection() as conn:
+        scheduled = dict(conn.execute('SELECT source, next_poll_at FROM feed_schedule').fetchall())
+    next_poll = min(scheduled.get(source, 0) for source in sources)
+    return min(max(next_poll - time.time(), 1), 60)
+
+def run_ingestion(sources=None):
+    """Run one ingestion pass over the given sources (all feeds by default)."""
+    started = time.monotonic()
+    known_links.refresh()
+    outputs, stats = build_ingestion_pipeline().run(sources or list(FEEDS))
+    for source in pending_feeds.abandon():
+        # Some entries were dropped by a failing stage; poll the feed in full again next time
+        record_feed_poll(source, failed=True)
+    
+    totals = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'duplicates': 0, 'failed': 0}
+    for counts in outputs:
+        for key, value in counts.items():
+            totals[key] += value
+    stats['write'].update(totals)
+    
+    logger.info(
+        f"Ingestion finished in {time.monotonic() - started:.1f}s: "
+        + ", ".join(f"{name} {s['in']} in/{s['out']} out/{s['errors']} errors" for name, s in stats.items())
+        + " (" + ", ".join(f"{k} {v}" for k, v in totals.items()) + ")"
+    )
+    return stats
+
+def background_feed_update(sources=None):
+    """Poll each feed whenever its schedule says it is due, forever."""
+    sources = list(sources or FEEDS)
     while True:
         try:
-            feeds = fetch_all_feeds()
-            for source, entries in feeds.items():
-                for entry in entries:
-                    try:
-                        store_article(entry, source)
-                    except Exception as e:
-                        logger.error(f"Error storing article from {source}: {str(e)}")
+            due = db.write(claim_due_feeds, sources)
+            if due:
+                run_ingestion(due)
         except Exception as e:
             logger.error(f"Error in background feed update: {str(e)}")
         
-        time.sleep(3600)  # Sleep for 1 hour
+        time.sleep(seconds_until_next_poll(sources))
 
 def init_app():
-    """Initialize the application."""
+    """Prepare the database and start periodic ingestion in a background thread."""
     try:
         init_db()
         
-        # Fetch initial articles in parallel
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            futures = []
-            for source, config in FEEDS.items():
-                def fetch_source_articles(src, cfg):
-                    entries = fetch_feed(src, cfg)
-                    for entry in entries:
-                        store_article(entry, src)
-                    return len(entries)
-                
-                futures.append(executor.submit(fetch_source_articles, source, config))
-            
-            # Wait for all fetches to complete
-            for future in futures:
-                try:
-                    future.result()
-                except Exception as e:
-                    logger.error(f"Failed to fetch feed: {str(e)}")
-        
-        # Start background feed update thread with a delay
-        def delayed_start():
-            time.sleep(3600)  # Wait 1 hour before starting background updates
-            background_feed_update()
-        
-        update_thread = threading.Thread(target=delayed_start, daemon=True)
+        update_thread = threading.Thread(target=background_feed_update, daemon=True)
         update_thread.start()
         
     except Exception as e:
         logger.error(f"Error initializing app: {str(e)}")
         raise
 
-# Call init_app when the application starts
-with app.app_context():
-    init_app()
+_db_ready = False
+_db_ready_lock = threading.Lock()
+
+@app.before_request
+def ensure_db():
+    """Create or migrate the schema on a worker's first request, if nothing has yet.
+    
+    Importing the app does no I/O; ingestion runs from `flask ingest` or `python app.py`.
+    """
+    global _db_ready
+    if _db_ready:
+        return
+    with _db_ready_lock:
+        if _db_ready:
+            return
+        with db.read_connection() as conn:
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version < SCHEMA_VERSION:
+            init_db()
+        _db_ready = True
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Create or migrate the database schema."""
+    init_db()
+    click.echo(f"Database ready at {db.DATABASE_PATH}")
+
+@app.cli.command('ingest')
+@click.option('--watch', is_flag=True, help="Keep running, polling each feed on its own schedule.")
+@click.option('--source', 'sources', multiple=True, type=click.Choice(list(FEEDS)),
+              help='Only ingest this source; may be repeated.')
+def ingest_command(watch, sources):
+    """Fetch feeds and store new articles."""
+    init_db()
+    if watch:
+        background_feed_update(list(sources) or None)
+    else:
+        run_ingestion(list(sources) or None)
+        wait_for_image_variants()
+
+def get_sources():
+    with db.read_connection() as conn:
+        c = conn.cursor()
+        c.execute('SELECT DISTINCT source FROM articles ORDER BY source')
+        return [row[0] for row in c.fetchall()]
+
+def get_tag_counts():
+    """(name, article count) for every tag in use, by name."""
+    with db.read_connection() as conn:
+        c = conn.cursor()
+        c.execute('''
+            SELECT t.name, COUNT(*)
+            FROM tags t JOIN article_tags at ON at.tag_id = t.id
+            GROUP BY t.id
+            ORDER BY t.name
+        ''')
+        return [tuple(row) for row in c.fetchall()]
+
+def sources_payload():
+    return {'sources': get_sources()}
+
+def tags_payload():
+    tag_counts = get_tag_counts()
+    return {
+        'tags': [name for name, _ in tag_counts],
+        'counts': dict(tag_counts)
+    }
 
 @app.route('/api/sources')
+@api_validators(API_LISTS_MAX_AGE)
+@cached_response
 def api_sources():
-    conn = sqlite3.connect('articles.db')
-    c = conn.cursor()
-    try:
-        c.execute('SELECT DISTINCT source FROM articles ORDER BY source')
-        sources = [row[0] for row in c.fetchall()]
-        return jsonify({'sources': sources})
-    finally:
-        conn.close()
+    return jsonify(sources_payload())
 
 @app.route('/api/tags')
+@api_validators(API_LISTS_MAX_AGE)
+@cached_response
 def api_tags():
-    conn = sqlite3.connect('articles.db')
-    c = conn.cursor()
-    try:
-        c.execute('SELECT DISTINCT tags FROM articles WHERE tags IS NOT NULL')
-        tag_rows = c.fetchall()
-        # Split comma-separated tags and create a unique set
-        all_tags = set()
-        for row in tag_rows:
-            if row[0]:
-                all_tags.update(tag.strip() for tag in row[0].split(','))
-        return jsonify({'tags': sorted(list(all_tags))})
-    finally:
-        conn.close()
+    return jsonify(tags_payload())
+
+def export_listings():
+    """Every listing the snapshot covers, as (kind, name, path segment) tuples.
+    
+    Tags that can't be a single path segment have no static page.
+    """
+    listings = [('all', None, 'all')]
+    listings.extend(('source', source, source) for source in get_sources())
+    for name, _ in get_tag_counts():
+        if '/' in name or '\\' in name or name.strip('.') == '':
+            logger.info(f"[EXPORT] Skipping tag with no static path: {name}")
+            continue
+        listings.append(('tag', name, name))
+    return listings
+
+def listing_shard_dir(kind, name):
+    if kind == 'all':
+        return 'api/articles/all'
+    key = tag_key(name) if kind == 'tag' else name
+    slug = re.sub(r'[^a-z0-9]+', '-', key.lower()).strip('-')
+    # Slugs can collide, so keep the full name in the directory too, hashed
+    return f"api/articles/{kind}/{slug}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}"
+
+def listing_fingerprints():
+    """{(kind, name): {bucket: fingerprint}} over every stored article.
+    
+    A fingerprint covers everything a shard shows, so it only changes when
+    one of the bucket's articles is added or rewritten.
+    """
+    with db.read_connection() as conn:
+        tags_by_article = {}
+        for article_id, name in conn.execute(
+            'SELECT at.article_id, t.name FROM article_tags at JOIN tags t ON t.id = at.tag_id'
+        ):
+            tags_by_article.setdefault(article_id, []).append(name)
+        
+        hashers = {}
+        for row in conn.execute(
+            'SELECT id, published, source, content_hash, image_url, image_placeholder'
+            ' FROM articles ORDER BY published DESC, id DESC'
+        ):
+            fingerprint = '\x1f'.join(str(value or '') for value in row).encode('utf-8') + b'\x1e'
+            bucket = row['published'] // EXPORT_SHARD_SECONDS
+            for listing in [('all', None), ('source', row['source'])] + [
+                ('tag', name) for name in tags_by_article.get(row['id'], [])
+            ]:
+                buckets = hashers.setdefault(listing, {})
+                if bucket not in buckets:
+                    buckets[bucket] = hashlib.sha256()
+                buckets[bucket].update(fingerprint)
+    
+    return {
+        listing: {bucket: hasher.hexdigest() for bucket, hasher in buckets.items()}
+        for listing, buckets in hashers.items()
+    }
+
+def get_shard_articles(kind, name, bucket):
+    """The articles of one listing published within one shard bucket, newest first."""
+    start = bucket * EXPORT_SHARD_SECONDS
+    params = [start, start + EXPORT_SHARD_SECONDS]
+    if kind == 'tag':
+        query = (
+            "SELECT a.* FROM article_tags at JOIN articles a ON a.id = at.article_id"
+            " WHERE at.tag_id = (SELECT id FROM tags WHERE key = ?)"
+            " AND at.published >= ? AND at.published < ?"
+            " ORDER BY at.published DESC, at.article_id DESC"
+        )
+        params.insert(0, tag_key(name))
+    elif kind == 'source':
+        query = (
+            "SELECT * FROM articles WHERE source = ? AND published >= ? AND published < ?"
+            " ORDER BY published DESC, id DESC"
+        )
+        params.insert(0, name)
+    else:
+        query = "SELECT * FROM articles WHERE published >= ? AND published < ? ORDER BY published DESC, id DESC"
+    with db.read_connection() as conn:
+        return [row_to_article(row) for row in conn.execute(query, params)]
+
+def export_snapshot(out_dir=None, pages=None):
+    """Export pages and API JSON as static files, rebuilding only shards that changed.
+    
+    Every listing (all articles, each source, each tag) gets week-long JSON
+    shards with content-hashed names plus an index.json listing them newest
+    first. Pages embed that list, and infinite scroll walks it instead of
+    calling /api/articles. There is no image proxy in a static deployment,
+    so pages load images straight from the publishers.
+    
+    Shards are reused only if out_dir still holds the previous export and
+    its state file; into an empty directory everything is rebuilt.
+    """
+    snapshot = Snapshot(out_dir or EXPORT_DIR)
+    pages = EXPORT_PAGES if pages is None else pages
+    fingerprints = listing_fingerprints()
+    
+    def dumps(payload):
+        return app.json.dumps(payload).encode('utf-8')
+    
+    def render_page(rel_path, shards, **context):
+        articles, _ = get_articles(**{key: context[key] for key in ('page', 'source', 'tag') if key in context})
+        # Scrolling continues from the shard holding the last article shown
+        if articles:
+            last_bucket = articles[-1]['published'] // EXPORT_SHARD_SECONDS
+            shards = [url for bucket, url in shards if bucket <= last_bucket]
+        else:
+            shards = []
+        with app.test_request_context():
+            html = render_template('index.html', entries=articles, next_cursor=None,
+                                   static_shards=shards, image_proxy=False, **context)
+        snapshot.write(rel_path, html.encode('utf-8'))
+    
+    for kind, name, segment in export_listings():
+        shard_dir = listing_shard_dir(kind, name)
+        shards = []
+        for bucket, fingerprint in sorted(fingerprints.get((kind, name), {}).items(), reverse=True):
+            url = snapshot.shard(
+                f'{shard_dir}/{bucket}', fingerprint, shard_dir, str(bucket),
+                lambda: dumps({'articles': get_shard_articles(kind, name, bucket)})
+            )
+            shards.append((bucket, url))
+        snapshot.write(f'{shard_dir}/index.json', dumps({'shards': [url for _, url in shards]}))
+        
+        if kind == 'all':
+            render_page('index.html', shards, page=1)
+            for page in range(2, pages + 1):
+                render_page(f'page/{page}.html', shards, page=page)
+        else:
+            render_page(f'{kind}/{segment}.html', shards, page=1, **{kind: name})
+    
+    with app.test_request_context():
+        for page in ('shop', 'archive'):
+            snapshot.write(f'{page}.html', render_template(f'{page}.html').encode('utf-8'))
+    
+    for name, payload in (('sources', sources_payload()), ('tags', tags_payload())):
+        snapshot.write(f'api/{name}.json', dumps(payload))
+    
+    return snapshot.finish()
+
+@app.cli.command('export')
+@click.option('--out', 'out_dir', type=click.Path(file_okay=False), default=None,
+              help=f'Directory to export into (default {EXPORT_DIR}).')
+@click.option('--pages', type=int, default=None, help=f'Index pages to render (default {EXPORT_PAGES}).')
+def export_command(out_dir, pages):
+    """Export pages and API JSON as a static site."""
+    init_db()
+    counts = export_snapshot(out_dir, pages)
+    click.echo(f"Exported to {out_dir or EXPORT_DIR}: " + ", ".join(f"{k} {v}" for k, v in counts.items()))
 
 @app.route('/shop')
 def shop():
@@ -874,4 +2669,8 @@ def archive():
     return render_template('archive.html')
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5001) 
\ No newline at end of file
+    debug = True
+    # The reloader runs this module twice; only ingest in the process that serves
+    if not debug or is_running_from_reloader():
+        init_app()
+    app.run(debug=debug, host='0.0.0.0', port=5001) 
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""Measure how long a fresh worker takes to import the app and answer its first request.
+
+Each run starts a new Python process, so nothing is shared between runs
+except the articles database. The response cache is pointed at an empty
+directory, so the first request always reaches the database.
+
+Usage: python benchmarks/cold_start.py [--runs 10] [--path /api/articles]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = 200
+
+CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get(sys.argv[1])
+finished = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'first_response_ms': (finished - imported) * 1000,
+    'status': response.status_code
+}))
+'''
+
+
+def run_once(path):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(os.environ, RESPONSE_CACHE_DIR=cache_dir)
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, '-c', CHILD, path],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result['process_ms'] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--path', default='/api/articles')
+    args = parser.parse_args()
+
+    # The first run may create or migrate the schema; leave it out
+    run_once(args.path)
+    results = [run_once(args.path) for _ in range(args.runs)]
+
+    for field in ('import_ms', 'first_response_ms', 'process_ms'):
+        values = [result[field] for result in results]
+        print(f"{field:>18}: median {statistics.median(values):7.1f}  max {max(values):7.1f}")
+
+    time_to_first_response = statistics.median(r['import_ms'] + r['first_response_ms'] for r in results)
+    verdict = 'ok' if time_to_first_response <= BUDGET_MS else 'OVER BUDGET'
+    print(f"import + first response: {time_to_first_response:.1f} ms (budget {BUDGET_MS} ms) {verdict}")
+    return 0 if time_to_first_response <= BUDGET_MS else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
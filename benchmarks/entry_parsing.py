@@ -0,0 +1,96 @@
+"""Compare per-entry HTML processing: BeautifulSoup passes vs the single-pass processor.
+
+The baseline reproduces what ingestion used to do for each entry: one
+html.parser tree for the summary text and another for the content images.
+
+Usage: python benchmarks/entry_parsing.py [feed.xml ...]
+Feeds default to the fixtures written by benchmarks/record_feeds.py.
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+import feedparser
+from bs4 import BeautifulSoup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import entry_content_html, summary_text  # noqa: E402
+from entry_html import process_entry_html  # noqa: E402
+
+DEFAULT_FEEDS = os.path.join(ROOT, 'benchmarks', 'fixtures', 'feeds', '*.xml')
+
+
+def baseline(summary_html, content_html):
+    soup = BeautifulSoup(summary_html, 'html.parser')
+    for img in soup.find_all('img'):
+        img.decompose()
+    summary = summary_text(soup.get_text(strip=True))
+
+    image = None
+    if content_html:
+        for img in BeautifulSoup(content_html, 'html.parser').find_all('img'):
+            src = img.get('src')
+            if src and not any(x in src.lower() for x in ['avatar', 'logo', 'icon']):
+                image = src
+                break
+    return summary, image
+
+
+def single_pass(summary_html, content_html):
+    summary = process_entry_html(summary_html)
+    content = summary if content_html == summary_html else process_entry_html(content_html)
+    image = next((
+        candidate['url'] for candidate in content.images
+        if not candidate['url'].startswith('data:')
+        and not any(x in candidate['url'].lower() for x in ['avatar', 'logo', 'icon'])
+    ), None)
+    return summary_text(summary.text), image
+
+
+def time_per_entry(func, entries, repeat):
+    """Best-of-repeat microseconds per entry."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for summary_html, content_html in entries:
+            func(summary_html, content_html)
+        timings.append((time.perf_counter() - started) / len(entries) * 1e6)
+    return min(timings), statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('feeds', nargs='*')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    paths = args.feeds or sorted(glob.glob(DEFAULT_FEEDS))
+    if not paths:
+        sys.exit("No feeds to parse; record some with benchmarks/record_feeds.py or pass paths")
+
+    entries = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            feed = feedparser.parse(f.read())
+        for entry in feed.entries[:50]:
+            entries.append((entry.get('summary', ''), entry_content_html(entry)))
+    print(f"{len(entries)} entries from {len(paths)} feeds")
+
+    same_image = sum(baseline(*entry)[1] == single_pass(*entry)[1] for entry in entries)
+    print(f"same content image for {same_image}/{len(entries)} entries")
+
+    results = {}
+    for name, func in (('beautifulsoup', baseline), ('single-pass', single_pass)):
+        best, median = time_per_entry(func, entries, args.repeat)
+        results[name] = best
+        print(f"{name:>14}: best {best:8.1f} us/entry  median {median:8.1f} us/entry")
+    print(f"speedup: {results['beautifulsoup'] / results['single-pass']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
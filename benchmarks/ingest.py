@@ -0,0 +1,298 @@
+"""Benchmark ingestion offline against a local stand-in for the feed publishers.
+
+Every source in FEEDS is served by benchmarks/standin.py, from the fixtures
+recorded with benchmarks/record_feeds.py or from synthetic feeds when there
+are none. Two fresh worker processes each get an empty database:
+
+- end_to_end runs the full pipeline twice: a cold pass that stores every
+  entry, then a warm pass where the feeds revalidate as unchanged.
+- stages runs fetch, parse, enrich and write one after another in isolation.
+
+Reports entries/sec, outbound requests per entry, peak RSS and DB write
+time, and saves everything as JSON so runs can be compared.
+
+Usage: python benchmarks/ingest.py [--latency 0.05] [--failure-rate 0.1]
+       python benchmarks/ingest.py --compare old.json new.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from standin import Publisher, slugify  # noqa: E402
+
+DEFAULT_OUT = os.path.join(ROOT, 'benchmarks', 'results')
+SCENARIOS = ('end_to_end', 'stages')
+
+
+def app_environment(workdir):
+    """Point every on-disk store at workdir and keep variant generation out of the numbers."""
+    return {
+        'ARTICLES_DB': os.path.join(workdir, 'articles.db'),
+        'IMAGE_CACHE_DIR': os.path.join(workdir, 'image_cache'),
+        'RESPONSE_CACHE_DIR': os.path.join(workdir, 'response_cache'),
+        'METRICS_DB': os.path.join(workdir, 'metrics.db'),
+        # Every source is served from one stand-in host, which per-host limits would throttle
+        'OUTBOUND_HOST_RATE': '0',
+        'OUTBOUND_HOST_CONCURRENCY': '64',
+        'IMAGE_VARIANTS_PREGENERATE': '0'
+    }
+
+
+def take_counts(base_url):
+    with urllib.request.urlopen(f'{base_url}/_counts') as response:
+        counts = json.load(response)
+    counts['total'] = sum(counts.values())
+    return counts
+
+
+def per_second(count, seconds):
+    return round(count / seconds, 2) if seconds else None
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process, and of its finished child processes (Linux reports KB)."""
+    return {
+        'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    }
+
+
+def shutdown_parse_pool(app):
+    # Parse workers only count towards RUSAGE_CHILDREN once they have exited
+    if app._parse_pool is not None:
+        app._parse_pool.shutdown()
+        app._parse_pool = None
+
+
+def ingestion_pass(app, base_url):
+    take_counts(base_url)
+    started = time.perf_counter()
+    stats = app.run_ingestion()
+    seconds = time.perf_counter() - started
+    requests_made = take_counts(base_url)
+    entries = stats['parse']['out']
+    return {
+        'seconds': round(seconds, 3),
+        'entries': entries,
+        'entries_per_second': per_second(entries, seconds),
+        'requests': requests_made,
+        'requests_per_entry': round(requests_made['total'] / entries, 3) if entries else None,
+        'db_write_seconds': round(stats['write']['seconds'], 3),
+        'pipeline': stats
+    }
+
+
+def run_end_to_end(app, base_url):
+    results = {
+        'cold': ingestion_pass(app, base_url),
+        'warm': ingestion_pass(app, base_url)
+    }
+    shutdown_parse_pool(app)
+    results['peak_rss_kb'] = peak_rss_kb()
+    return results
+
+
+def timed_stage(base_url, func, items):
+    take_counts(base_url)
+    started = time.perf_counter()
+    outputs = func(items)
+    seconds = time.perf_counter() - started
+    requests_made = take_counts(base_url)
+    return outputs, {
+        'items': len(items),
+        'outputs': len(outputs),
+        'seconds': round(seconds, 3),
+        'items_per_second': per_second(len(items), seconds),
+        'requests': requests_made
+    }
+
+
+def run_stages(app, base_url):
+    def fetch(sources):
+        bodies = []
+        for source in sources:
+            try:
+                body, _ = app.fetch_feed_body(source, app.FEEDS[source]['url'])
+            except Exception as e:
+                print(f"fetch {source}: {e}", file=sys.stderr)
+                continue
+            bodies.append((source, body))
+        return bodies
+
+    def parse(bodies):
+        # Inline rather than in the process pool, to time the parsing itself
+        return [
+            entry for source, body in bodies
+            for entry in app.parse_feed_entries(source, body, app.FEEDS[source].get('image_selector'))
+        ]
+
+    def enrich(entries):
+        def resolve(entry):
+            resolution = app.resolve_article_image(entry['link'], app.FEEDS[entry['source']].get('image_selector'))
+            entry['image_resolution'] = resolution
+            entry['image_url'] = resolution[0]
+        with ThreadPoolExecutor(max_workers=app.INGEST_CONCURRENCY) as pool:
+            list(pool.map(resolve, entries))
+        return entries
+
+    def write(entries):
+        for start in range(0, len(entries), 100):
+            app.store_articles(entries[start:start + 100])
+        return entries
+
+    results = {}
+    bodies, results['fetch'] = timed_stage(base_url, fetch, list(app.FEEDS))
+    entries, results['parse'] = timed_stage(base_url, parse, bodies)
+    _, results['enrich'] = timed_stage(base_url, enrich, [entry for entry in entries if not entry['image_url']])
+    _, results['write'] = timed_stage(base_url, write, entries)
+    for stage in ('fetch', 'enrich'):
+        items = results[stage]['items']
+        results[stage]['requests_per_item'] = round(results[stage]['requests']['total'] / items, 3) if items else None
+    shutdown_parse_pool(app)
+    results['peak_rss_kb'] = peak_rss_kb()
+    return results
+
+
+def child(scenario, base_url, result_path):
+    """Run one scenario inside a worker whose environment points at an empty workdir."""
+    import logging
+    import app
+    # Keep per-feed and per-batch progress lines out of the benchmark output
+    logging.getLogger().setLevel(logging.WARNING)
+    for source in app.FEEDS:
+        app.FEEDS[source]['url'] = f'{base_url}/feeds/{slugify(source)}.xml'
+    app.init_db()
+
+    run = run_end_to_end if scenario == 'end_to_end' else run_stages
+    with open(result_path, 'w') as f:
+        json.dump(run(app, base_url), f)
+
+
+def run_scenario(scenario, base_url, env):
+    with tempfile.TemporaryDirectory() as workdir:
+        result_path = os.path.join(workdir, 'result.json')
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', scenario, base_url, result_path],
+            cwd=ROOT, env=dict(os.environ, **env, **app_environment(workdir)), check=True
+        )
+        with open(result_path) as f:
+            return json.load(f)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summary(results):
+    """The headline numbers of a run, flattened for printing and comparing."""
+    end_to_end, stages = results['end_to_end'], results['stages']
+    rows = {}
+    cold, warm = end_to_end['cold'], end_to_end['warm']
+    rows['cold entries/sec'] = cold['entries_per_second']
+    rows['cold requests/entry'] = cold['requests_per_entry']
+    rows['cold db write s'] = cold['db_write_seconds']
+    # Unchanged feeds yield no entries, so the warm pass is measured per run
+    rows['warm s'] = warm['seconds']
+    rows['warm requests'] = warm['requests']['total']
+    rows['peak rss MB'] = round(end_to_end['peak_rss_kb']['self'] / 1024, 1)
+    rows['peak parse worker rss MB'] = round(end_to_end['peak_rss_kb']['children'] / 1024, 1)
+    rows['fetch feeds/sec'] = stages['fetch']['items_per_second']
+    rows['parse entries/sec'] = per_second(stages['parse']['outputs'], stages['parse']['seconds'])
+    rows['enrich entries/sec'] = stages['enrich']['items_per_second']
+    rows['write entries/sec'] = stages['write']['items_per_second']
+    return rows
+
+
+def print_comparison(old, new):
+    old_rows, new_rows = summary(old), summary(new)
+    print(f"{'':>28} {old['git_commit'] or 'old':>12} {new['git_commit'] or 'new':>12}")
+    for name, value in new_rows.items():
+        before = old_rows.get(name)
+        change = f"{(value - before) / before * 100:+.0f}%" if before and value is not None else ''
+        print(f"{name:>28} {before if before is not None else '-':>12} {value if value is not None else '-':>12} {change:>6}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(*sys.argv[2:5])
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every stand-in response')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--parse-processes', type=int, help='INGEST_PARSE_PROCESSES for the run')
+    parser.add_argument('--concurrency', type=int, help='INGEST_CONCURRENCY for the run')
+    parser.add_argument('--out', default=DEFAULT_OUT)
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='Compare two saved results and exit')
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f, open(args.compare[1]) as g:
+            print_comparison(json.load(f), json.load(g))
+        return
+
+    env = {}
+    if args.parse_processes is not None:
+        env['INGEST_PARSE_PROCESSES'] = str(args.parse_processes)
+    if args.concurrency is not None:
+        env['INGEST_CONCURRENCY'] = str(args.concurrency)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ.update(app_environment(workdir))
+        from app import FEEDS
+
+        publisher = Publisher(
+            {source: feed['url'] for source, feed in FEEDS.items()},
+            latency=args.latency, failure_rate=args.failure_rate, seed=args.seed
+        ).start()
+        try:
+            results = {
+                'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'git_commit': git_commit(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'config': {
+                    'latency': args.latency,
+                    'failure_rate': args.failure_rate,
+                    'seed': args.seed,
+                    **env
+                },
+                'fixtures': {source: 'recorded' if recorded else 'synthetic' for source, recorded in publisher.recorded.items()}
+            }
+            for scenario in SCENARIOS:
+                results[scenario] = run_scenario(scenario, publisher.base_url, env)
+        finally:
+            publisher.stop()
+
+    for name, value in summary(results).items():
+        print(f"{name:>28} {value if value is not None else '-':>12}")
+
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"ingest-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Record the current body of every feed in FEEDS as a benchmark fixture.
+
+Article pages on the publisher's own host are recorded as well, for the
+first --pages entries of each feed, so benchmarks/ingest.py can replay
+enrichment exactly.
+
+Usage: python benchmarks/record_feeds.py [--out benchmarks/fixtures/feeds] [--pages 20]
+"""
+import argparse
+import os
+import sys
+import urllib.parse
+
+import feedparser
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import FEEDS  # noqa: E402
+from standin import page_fixture_path, slugify  # noqa: E402
+
+DEFAULT_OUT = os.path.join(ROOT, 'benchmarks', 'fixtures', 'feeds')
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'}
+
+
+def fixture_name(source):
+    return slugify(source) + '.xml'
+
+
+def record_pages(source, feed_url, body, limit):
+    host = urllib.parse.urlsplit(feed_url).netloc
+    recorded = 0
+    for entry in feedparser.parse(body).entries[:limit]:
+        link = urllib.parse.urlsplit(entry.get('link', ''))
+        if link.netloc != host:
+            continue
+        path = link.path + ('?' + link.query if link.query else '')
+        try:
+            response = requests.get(entry.link, timeout=15, headers=HEADERS)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print(f"{source}: {e}", file=sys.stderr)
+            continue
+        fixture = page_fixture_path(slugify(source), path)
+        os.makedirs(os.path.dirname(fixture), exist_ok=True)
+        with open(fixture, 'wb') as f:
+            f.write(response.content)
+        recorded += 1
+    return recorded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', default=DEFAULT_OUT)
+    parser.add_argument('--pages', type=int, default=20, help='Article pages to record per feed')
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for source, feed in FEEDS.items():
+        try:
+            response = requests.get(feed['url'], timeout=15, headers=dict(
+                HEADERS, Accept='application/rss+xml, application/xml'
+            ))
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print(f"{source}: {e}", file=sys.stderr)
+            continue
+        path = os.path.join(args.out, fixture_name(source))
+        with open(path, 'wb') as f:
+            f.write(response.content)
+        print(f"{source}: {len(response.content)} bytes -> {path}")
+        if args.pages:
+            pages = record_pages(source, feed['url'], response.content, args.pages)
+            print(f"{source}: {pages} article pages")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""Local stand-in for the feed publishers, so ingestion can be benchmarked offline.
+
+Feeds and article pages come from the fixtures written by record_feeds.py.
+Sources without a recording get a deterministic synthetic feed instead, so
+the suite runs on a fresh checkout. Links to each publisher's own host are
+rewritten to point back at the stand-in, so enrichment never leaves the box.
+"""
+import collections
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import urllib.parse
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+WORDS = (
+    'watch dial case bracelet movement caliber chronograph bezel crown lume strap steel '
+    'bronze titanium limited edition reference vintage automatic manual diver dress'
+).split()
+
+
+def slugify(source):
+    return re.sub(r'[^a-z0-9]+', '-', source.lower()).strip('-')
+
+
+def page_fixture_path(slug, path):
+    """Where record_feeds.py stores the article page at path for a source."""
+    return os.path.join(FIXTURES, 'pages', slug, hashlib.sha1(path.encode('utf-8')).hexdigest() + '.html')
+
+
+def synthetic_feed(source, host, entries=50, seed=0):
+    """A WordPress-style RSS feed; every other entry has no image in the feed."""
+    rng = random.Random(f'{seed}:{source}')
+    now = 1700000000
+    items = []
+    for n in range(entries):
+        paragraphs = ''.join(
+            '<p>' + ' '.join(rng.choice(WORDS) for _ in range(rng.randint(30, 80)))
+            + f' <a href="https://{host}/tag/{rng.choice(WORDS)}/">{rng.choice(WORDS)}</a>.</p>'
+            for _ in range(rng.randint(4, 12))
+        )
+        media = f'<media:content url="https://{host}/wp-content/uploads/{n}.jpg" medium="image"/>' if n % 2 else ''
+        categories = ''.join(f'<category><![CDATA[{rng.choice(WORDS).title()}]]></category>' for _ in range(3))
+        items.append(
+            f'<item><title>{source} article {n}</title>'
+            f'<link>https://{host}/articles/{n}/</link>'
+            f'<pubDate>{formatdate(now - n * rng.randint(3600, 86400), usegmt=True)}</pubDate>'
+            f'{categories}'
+            f'<description><![CDATA[{paragraphs[:600]}]]></description>'
+            f'<content:encoded><![CDATA[{paragraphs}]]></content:encoded>{media}</item>'
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/" '
+        'xmlns:media="http://search.yahoo.com/mrss/">'
+        f'<channel><title>{source}</title>{"".join(items)}</channel></rss>'
+    ).encode('utf-8')
+
+
+def synthetic_page(path):
+    """An article page; most declare og:image, the rest only have an image in the body."""
+    digest = hashlib.sha1(path.encode('utf-8')).digest()
+    body = '<p>' + ' '.join(WORDS[b % len(WORDS)] for b in digest * 40) + '</p>'
+    head = '<title>Article</title><link rel="stylesheet" href="/style.css">'
+    if digest[0] % 5:
+        head += f'<meta property="og:image" content="/images/{digest.hex()}.jpg">'
+    hero = f'<img class="article-hero featured" src="/images/{digest.hex()}-hero.jpg">'
+    return f'<!DOCTYPE html><html><head>{head}</head><body><header>{body}</header>{hero}{body * 5}</body></html>'.encode('utf-8')
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Ingestion hangs up on article pages once it has read the <head>
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class Publisher:
+    """Serve every source's feed under /feeds/<slug>.xml and its pages under /site/<slug>/.
+
+    latency (seconds) is added to every response and failure_rate of the
+    requests are answered with a 503. Feeds support ETag revalidation.
+    GET /_counts returns the requests served by kind since the last call,
+    so a benchmark in another process can attribute them to its phases.
+    """
+
+    def __init__(self, feeds, latency=0.0, failure_rate=0.0, seed=0):
+        self.feeds = feeds
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.requests = collections.Counter()
+        self.recorded = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._bodies = {}
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self._server.server_port}'
+
+    def feed_url(self, source):
+        return f'{self.base_url}/feeds/{slugify(source)}.xml'
+
+    def start(self):
+        publisher = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                publisher.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = _Server(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+        for source, feed_url in self.feeds.items():
+            slug = slugify(source)
+            host = urllib.parse.urlsplit(feed_url).netloc
+            path = os.path.join(FIXTURES, 'feeds', slug + '.xml')
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    body = f.read()
+                self.recorded[source] = True
+            else:
+                body = synthetic_feed(source, host)
+                self.recorded[source] = False
+            local = f'{self.base_url}/site/{slug}'.encode('ascii')
+            for scheme in (b'https://', b'http://'):
+                body = body.replace(scheme + host.encode('ascii'), local)
+            self._bodies[slug] = body
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def take_counts(self):
+        with self._lock:
+            counts = dict(self.requests)
+            self.requests.clear()
+        return counts
+
+    def handle(self, handler):
+        path = handler.path
+        if path == '/_counts':
+            self._send(handler, 200, json.dumps(self.take_counts()).encode('utf-8'), 'application/json')
+            return
+        kind = 'feed' if path.startswith('/feeds/') else 'page' if path.startswith('/site/') else 'other'
+        with self._lock:
+            self.requests[kind] += 1
+            failed = self.random.random() < self.failure_rate
+        if self.latency:
+            time.sleep(self.latency)
+
+        if failed:
+            self._send(handler, 503, b'Service Unavailable', 'text/plain')
+        elif kind == 'feed':
+            body = self._bodies.get(path[len('/feeds/'):].rsplit('.', 1)[0])
+            if body is None:
+                self._send(handler, 404, b'Not Found', 'text/plain')
+                return
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if handler.headers.get('If-None-Match') == etag:
+                self._send(handler, 304, b'', None, {'ETag': etag})
+            else:
+                self._send(handler, 200, body, 'application/rss+xml', {'ETag': etag})
+        elif kind == 'page':
+            slug, _, page_path = path[len('/site/'):].partition('/')
+            fixture = page_fixture_path(slug, '/' + page_path)
+            if os.path.exists(fixture):
+                with open(fixture, 'rb') as f:
+                    body = f.read()
+            else:
+                body = synthetic_page(path)
+            self._send(handler, 200, body, 'text/html; charset=utf-8')
+        else:
+            self._send(handler, 404, b'Not Found', 'text/plain')
+
+    def _send(self, handler, status, body, content_type, headers=None):
+        handler.send_response(status)
+        if content_type:
+            handler.send_header('Content-Type', content_type)
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        if body:
+            handler.wfile.write(body)
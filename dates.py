@@ -0,0 +1,69 @@
+"""Parsing feed dates into integer UTC epoch seconds."""
+import calendar
+import functools
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Formats seen in feeds that neither RFC 822 nor ISO 8601 parsing accepts
+STRPTIME_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%a, %d %b %Y %H:%M:%S'
+)
+
+# The parser that last worked for each source, tried first next time
+_preferred_parsers = {}
+
+
+def _rfc822(value):
+    return parsedate_to_datetime(value)
+
+
+def _iso8601(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _strptime(fmt, value):
+    return datetime.strptime(value, fmt)
+
+
+def _dateutil(value):
+    from dateutil import parser
+    return parser.parse(value)
+
+
+PARSERS = (
+    (_rfc822, _iso8601)
+    + tuple(functools.partial(_strptime, fmt) for fmt in STRPTIME_FORMATS)
+    + (_dateutil,)
+)
+
+
+def to_timestamp(value):
+    """Convert a datetime to UTC epoch seconds; naive datetimes are taken to be UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def struct_to_timestamp(value):
+    """Convert a UTC time.struct_time, as feedparser's *_parsed fields are, to epoch seconds."""
+    return calendar.timegm(value)
+
+
+def parse_timestamp(value, source=None):
+    """Parse a date string to UTC epoch seconds, or None if no parser accepts it."""
+    value = (value or '').strip()
+    if not value:
+        return None
+
+    preferred = _preferred_parsers.get(source)
+    parsers = PARSERS if preferred is None else (preferred,) + tuple(p for p in PARSERS if p is not preferred)
+    for parse in parsers:
+        try:
+            timestamp = to_timestamp(parse(value))
+        except (ValueError, TypeError, OverflowError, IndexError):
+            continue
+        _preferred_parsers[source] = parse
+        return timestamp
+    return None
@@ -0,0 +1,98 @@
+"""SQLite access layer: pooled WAL read connections and a single serialized writer."""
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DATABASE_PATH = os.environ.get(
+    'ARTICLES_DB',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'articles.db')
+)
+READ_POOL_SIZE = int(os.environ.get('ARTICLES_DB_READ_POOL', 8))
+BUSY_TIMEOUT_MS = 30000
+MMAP_SIZE = 256 * 1024 * 1024
+CACHE_SIZE_KB = 16 * 1024
+
+_read_pool = queue.LifoQueue(maxsize=READ_POOL_SIZE)
+
+_write_queue = queue.Queue()
+_writer_thread = None
+_writer_lock = threading.Lock()
+
+
+def connect(readonly=False):
+    """Open a tuned connection in autocommit mode, so transactions are always explicit."""
+    conn = sqlite3.connect(DATABASE_PATH, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute(f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}')
+    conn.execute(f'PRAGMA mmap_size = {MMAP_SIZE}')
+    conn.execute(f'PRAGMA cache_size = -{CACHE_SIZE_KB}')
+    if readonly:
+        conn.execute('PRAGMA query_only = ON')
+    else:
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+    return conn
+
+
+@contextmanager
+def read_connection():
+    """Borrow a read-only connection from the pool."""
+    try:
+        conn = _read_pool.get_nowait()
+    except queue.Empty:
+        conn = connect(readonly=True)
+    try:
+        yield conn
+    finally:
+        try:
+            _read_pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+def submit_write(func, *args):
+    """Queue func(conn, *args) to run in its own transaction on the writer connection.
+
+    Returns a Future with func's return value.
+    """
+    _ensure_writer()
+    future = Future()
+    _write_queue.put((future, func, args))
+    return future
+
+
+def write(func, *args):
+    """Run func(conn, *args) on the writer connection and wait for its result."""
+    return submit_write(func, *args).result()
+
+
+def _ensure_writer():
+    global _writer_thread
+    with _writer_lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(target=_run_writer, name='db-writer', daemon=True)
+            _writer_thread.start()
+
+
+def _run_writer():
+    conn = connect()
+    while True:
+        future, func, args = _write_queue.get()
+        if not future.set_running_or_notify_cancel():
+            continue
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            result = func(conn, *args)
+            conn.execute('COMMIT')
+        except BaseException as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            future.set_exception(e)
+        else:
+            future.set_result(result)
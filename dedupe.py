@@ -0,0 +1,79 @@
+"""Canonical article URLs and SimHash fingerprints for spotting duplicate stories."""
+import hashlib
+import re
+import urllib.parse
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid', 'ref', 'ref_src'}
+TRACKING_PREFIXES = ('utm_', '_hs', 'pk_')
+
+SIMHASH_BITS = 64
+MAX_DISTANCE = 5  # Light edits of a short title and summary flip four or five bits
+SIMHASH_BANDS = MAX_DISTANCE + 1  # So any two fingerprints within MAX_DISTANCE share a band
+MIN_TOKENS = 8  # Shorter texts are too generic to fingerprint
+
+_WORD = re.compile(r'\w+')
+
+
+def _band_layout():
+    """(bit offset, width) of each band, as even as the bits allow."""
+    widths = [SIMHASH_BITS // SIMHASH_BANDS + (band < SIMHASH_BITS % SIMHASH_BANDS) for band in range(SIMHASH_BANDS)]
+    return [(sum(widths[:band]), width) for band, width in enumerate(widths)]
+
+
+_BANDS = _band_layout()
+
+
+def canonicalize_url(url):
+    """Normalize an article URL so the same page always gets the same string.
+
+    Scheme becomes https, the host is lower-cased without www., tracking
+    parameters, fragments and trailing slashes are dropped, and the rest of
+    the query is sorted.
+    """
+    parsed = urllib.parse.urlsplit((url or '').strip())
+    host = (parsed.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parsed.port and parsed.port not in (80, 443):
+        host += f':{parsed.port}'
+    query = urllib.parse.urlencode(sorted(
+        (key, value) for key, value in urllib.parse.parse_qsl(parsed.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ))
+    path = re.sub(r'/{2,}', '/', parsed.path).rstrip('/') or '/'
+    return urllib.parse.urlunsplit(('https', host, path, query, ''))
+
+
+def text_simhash(*texts):
+    """64-bit SimHash of words and word pairs, as a signed integer for SQLite.
+
+    Returns None for texts with fewer than MIN_TOKENS words.
+    """
+    words = _WORD.findall(' '.join(text or '' for text in texts).casefold())
+    if len(words) < MIN_TOKENS:
+        return None
+
+    weights = [0] * SIMHASH_BITS
+    for feature in words + [f'{a} {b}' for a, b in zip(words, words[1:])]:
+        value = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    value = sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+    return value - (1 << SIMHASH_BITS) if value >= 1 << (SIMHASH_BITS - 1) else value
+
+
+def simhash_bands(value):
+    """(band, band value) pairs; near-duplicates share at least one of them."""
+    value &= (1 << SIMHASH_BITS) - 1
+    return [(band, value >> offset & ((1 << width) - 1)) for band, (offset, width) in enumerate(_BANDS)]
+
+
+def simhash_distance(a, b):
+    """Number of differing bits between two fingerprints."""
+    return bin((a ^ b) & ((1 << SIMHASH_BITS) - 1)).count('1')
+
+
+def is_near_duplicate(a, b):
+    return a is not None and b is not None and simhash_distance(a, b) <= MAX_DISTANCE
@@ -0,0 +1,101 @@
+"""Single-pass processing of the HTML in feed entries.
+
+lxml's C parser calls back into a small collector for every tag and text
+node, so each snippet is tokenized once and no tree is ever built.
+"""
+import re
+
+# Tags whose text is never shown
+SKIP_TAGS = {'script', 'style', 'template', 'noscript'}
+# Tags that separate words even without surrounding whitespace
+BREAK_TAGS = {
+    'br', 'p', 'div', 'li', 'ul', 'ol', 'tr', 'td', 'th', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'blockquote', 'figure', 'figcaption', 'section', 'article', 'header', 'footer', 'hr', 'img'
+}
+IMAGE_ATTRIBUTES = ('src', 'data-src', 'data-lazy-src')
+
+_srcset_separator = re.compile(r',\s+')
+
+
+class EntryHTML:
+    """What one pass over an HTML snippet found.
+
+    text is the visible text with whitespace collapsed. images lists image
+    candidates in document order as dicts with url, attribute (src,
+    data-src, data-lazy-src or srcset) and width (from srcset, else None).
+    links lists outbound hrefs in document order.
+    """
+
+    def __init__(self, text='', images=None, links=None):
+        self.text = text
+        self.images = images or []
+        self.links = links or []
+
+
+class _Collector:
+    """lxml parser target that gathers text, image candidates and links."""
+
+    def __init__(self):
+        self.text = []
+        self.images = []
+        self.links = []
+        self.skip_depth = 0
+
+    def start(self, tag, attrib):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag == 'img':
+            self.images.extend(image_candidates(attrib))
+        elif tag == 'a' and attrib.get('href'):
+            self.links.append(attrib['href'].strip())
+        if tag in BREAK_TAGS:
+            self.text.append(' ')
+
+    def end(self, tag):
+        if tag in SKIP_TAGS:
+            self.skip_depth -= 1
+        elif tag in BREAK_TAGS:
+            self.text.append(' ')
+
+    def data(self, data):
+        if not self.skip_depth:
+            self.text.append(data)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        return EntryHTML(' '.join(''.join(self.text).split()), self.images, self.links)
+
+
+def image_candidates(attrib):
+    """Image candidates for one <img>: src, lazy-load attributes, then srcset widest first."""
+    candidates = []
+    for name in IMAGE_ATTRIBUTES:
+        url = (attrib.get(name) or '').strip()
+        if url:
+            candidates.append({'url': url, 'attribute': name, 'width': None})
+
+    srcset = []
+    for candidate in _srcset_separator.split((attrib.get('srcset') or '').strip()):
+        parts = candidate.split()
+        if not parts:
+            continue
+        width = None
+        if len(parts) > 1 and parts[1].endswith('w') and parts[1][:-1].isdigit():
+            width = int(parts[1][:-1])
+        srcset.append({'url': parts[0].rstrip(','), 'attribute': 'srcset', 'width': width})
+    srcset.sort(key=lambda candidate: candidate['width'] or 0, reverse=True)
+    return candidates + srcset
+
+
+def process_entry_html(html):
+    """Parse an HTML snippet once and return an EntryHTML."""
+    # Imported here so that importing the web app doesn't load lxml
+    from lxml import etree
+
+    if not html or not html.strip():
+        return EntryHTML()
+    parser = etree.HTMLParser(target=_Collector())
+    parser.feed(html)
+    return parser.close()
@@ -0,0 +1,48 @@
+"""Adaptive polling intervals for feeds, based on how often they publish."""
+import random
+import statistics
+
+# Gaps shorter than this come from entries without real dates
+MIN_GAP = 1
+
+
+class PollPolicy:
+    """Decide how long to wait before polling a feed again.
+
+    A feed is polled at a fraction of its typical gap between articles, so
+    busy feeds are checked every few minutes and quiet ones a few times a
+    day, within [min_interval, max_interval]. Feeds without enough history
+    use default_interval. Errors back off exponentially, and every interval
+    is jittered so feeds don't end up polled in lockstep.
+    """
+
+    def __init__(self, min_interval, max_interval, default_interval, fraction=0.1, jitter=0.1, samples=20):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_interval = default_interval
+        self.fraction = fraction
+        self.jitter = jitter
+        self.samples = samples
+
+    def gaps(self, published):
+        """Seconds between consecutive publish timestamps, newest first."""
+        times = sorted(set(published), reverse=True)[:self.samples + 1]
+        return [newer - older for newer, older in zip(times, times[1:]) if newer - older >= MIN_GAP]
+
+    def cadence(self, gaps, last_published, now):
+        """Typical seconds between articles, or None without any history."""
+        if not gaps:
+            return None
+        cadence = statistics.median(gaps)
+        if last_published:
+            # A feed that has gone quiet is slower than its history suggests
+            cadence = max(cadence, (now - last_published) / 2)
+        return cadence
+
+    def interval(self, cadence, error_streak=0):
+        """Seconds until the next poll."""
+        interval = self.default_interval if cadence is None else cadence * self.fraction
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        if error_streak:
+            interval = min(interval * 2 ** min(error_streak, 10), self.max_interval)
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
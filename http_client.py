@@ -0,0 +1,204 @@
+"""Shared outbound HTTP client with per-host limits, retries and circuit breakers.
+
+Every request to a publisher goes through one OutboundClient, so keep-alive
+connections are reused across feeds, article pages and images. Each host
+gets its own connection pool, a cap on requests in flight, a token-bucket
+request rate and a circuit breaker that fails fast once the host keeps
+erroring, instead of letting every caller wait out its timeout.
+"""
+import logging
+import random
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """The host's circuit breaker is open, so the request was not sent."""
+
+
+class HostState:
+    """Limits and breaker state for one host."""
+
+    def __init__(self, concurrency, rate, burst):
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.refilled_at = time.monotonic()
+        self.failures = 0
+        self.open_until = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def take_token(self):
+        """Seconds to wait before a token is available, taking it if there is one now."""
+        if not self.rate:
+            return 0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.rate)
+            self.refilled_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def allow(self):
+        """Whether the breaker lets a request through; one probe is let through once it cools down."""
+        with self.lock:
+            if self.open_until == 0:
+                return True
+            if time.monotonic() < self.open_until or self.probing:
+                return False
+            self.probing = True
+            return True
+
+    def record(self, ok, threshold, cooldown):
+        """Update the breaker; returns True if this failure opened it."""
+        with self.lock:
+            self.probing = False
+            if ok:
+                self.failures = 0
+                self.open_until = 0.0
+                return False
+            self.failures += 1
+            if self.failures >= threshold:
+                # A failed probe reopens the breaker for another cooldown
+                opened = self.open_until == 0
+                self.open_until = time.monotonic() + cooldown
+                return opened
+            return False
+
+
+class OutboundClient:
+    """A pooled requests.Session wrapped in per-host concurrency, rate and breaker policies.
+
+    rate is requests per second per host (0 for unlimited). Idempotent
+    requests that hit a connection error or a retryable status are retried
+    up to retries times with jittered exponential backoff. After
+    breaker_threshold consecutive failed requests (connection errors,
+    timeouts or 5xx on the last attempt), a host fails fast for
+    breaker_cooldown seconds.
+
+    metrics, if given, receives per-host request counts by result (status
+    code, error, retried, fast_failed, circuit_opened) and latencies. Only
+    hosts in metric_hosts get their own label; every other host is reported
+    as 'other', since callers like the image proxy can reach any host.
+
+    State is kept for the max_hosts most recently used hosts. A host that
+    falls out of the table starts again with fresh limits and breaker.
+    """
+
+    def __init__(self, concurrency=8, rate=10, burst=20, retries=2, backoff=0.5,
+                 breaker_threshold=5, breaker_cooldown=60, pool_hosts=64, metrics=None,
+                 metric_hosts=(), max_hosts=1024):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.metrics = metrics
+        self.metric_hosts = {host.lower() for host in metric_hosts}
+        self.max_hosts = max_hosts
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._hosts = OrderedDict()
+        self._hosts_lock = threading.Lock()
+
+    def _host(self, host):
+        with self._hosts_lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = HostState(self.concurrency, self.rate, self.burst)
+                if len(self._hosts) > self.max_hosts:
+                    # Requests still holding the evicted state finish under it
+                    self._hosts.popitem(last=False)
+            else:
+                self._hosts.move_to_end(host)
+            return state
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        """Send a request like Session.request, under the host's policies.
+
+        Raises CircuitOpenError without sending anything while the host's
+        breaker is open. With stream=True the host's slot is released once
+        the headers have arrived; the caller still has to close the response.
+        """
+        host = (urllib.parse.urlsplit(url).hostname or '').lower()
+        state = self._host(host)
+        attempts = 1 + (self.retries if method.upper() in IDEMPOTENT_METHODS else 0)
+
+        if not state.allow():
+            self._count(host, 'fast_failed')
+            raise CircuitOpenError(f'Circuit open for {host}')
+
+        # The breaker counts requests, not attempts, so one request's retries
+        # can't open it on their own; it always hears back, even on an error
+        ok = False
+        try:
+            for attempt in range(attempts):
+                wait = state.take_token()
+                while wait:
+                    time.sleep(wait)
+                    wait = state.take_token()
+
+                started = time.perf_counter()
+                error = None
+                response = None
+                with state.slots:
+                    try:
+                        response = self.session.request(method, url, **kwargs)
+                    except requests.exceptions.RequestException as e:
+                        error = e
+                self._observe(host, time.perf_counter() - started)
+
+                retryable = (
+                    isinstance(error, requests.exceptions.ConnectionError)
+                    or (response is not None and response.status_code in RETRY_STATUSES)
+                )
+                if not retryable or attempt == attempts - 1:
+                    ok = error is None and response.status_code < 500
+                    self._count(host, 'error' if error is not None else str(response.status_code))
+                    if error is not None:
+                        raise error
+                    return response
+
+                if response is not None:
+                    response.close()
+                self._count(host, 'retried')
+                # Full jitter, so callers that failed together don't retry together
+                time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+        finally:
+            if state.record(ok, self.breaker_threshold, self.breaker_cooldown):
+                self._count(host, 'circuit_opened')
+                logger.error(f"[HTTP] Circuit opened for {host} after {state.failures} failures")
+
+    def _label(self, host):
+        return host if host in self.metric_hosts else 'other'
+
+    def _count(self, host, result):
+        if self.metrics is not None:
+            self.metrics.inc('outbound_requests_total', host=self._label(host), result=result)
+
+    def _observe(self, host, seconds):
+        if self.metrics is not None:
+            self.metrics.observe('outbound_request_seconds', seconds, host=self._label(host))
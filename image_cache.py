@@ -0,0 +1,198 @@
+"""Persistent on-disk cache for proxied images.
+
+Bodies are stored content-addressed under objects/, keyed by their SHA-256,
+and a small SQLite index maps normalized upstream URLs to them. The index is
+shared by every worker process using the same directory.
+"""
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import urllib.parse
+from contextlib import closing
+
+logger = logging.getLogger(__name__)
+
+# Only record an access if the previous one is older than this, to keep hits read-only
+TOUCH_INTERVAL = 60
+
+
+def normalize_url(url):
+    """Normalize an upstream URL into a cache key."""
+    parsed = urllib.parse.urlsplit(url.strip())
+    scheme = (parsed.scheme or 'https').lower()
+    netloc = (parsed.hostname or '').lower()
+    if parsed.port and (scheme, parsed.port) not in (('http', 80), ('https', 443)):
+        netloc += f':{parsed.port}'
+    query = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parsed.query, keep_blank_values=True)))
+    return urllib.parse.urlunsplit((scheme, netloc, parsed.path or '/', query, ''))
+
+
+class ImageCache:
+    """Byte-budgeted LRU cache of upstream images with negative entries for failures."""
+
+    def __init__(self, directory, max_bytes, ttl, negative_ttl):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.index_path = os.path.join(directory, 'index.db')
+        self._ready = False
+        self._ready_lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA synchronous = NORMAL')
+        return conn
+
+    def _ensure_ready(self):
+        """Create the cache directory and index on first use."""
+        if self._ready:
+            return
+        with self._ready_lock:
+            if self._ready:
+                return
+            os.makedirs(os.path.join(self.directory, 'objects'), exist_ok=True)
+            with closing(self._connect()) as conn:
+                conn.execute('PRAGMA journal_mode = WAL')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS entries (
+                        key TEXT PRIMARY KEY,
+                        digest TEXT,
+                        content_type TEXT,
+                        size INTEGER NOT NULL DEFAULT 0,
+                        etag TEXT,
+                        last_modified TEXT,
+                        status INTEGER NOT NULL,
+                        error TEXT,
+                        fetched_at REAL NOT NULL,
+                        accessed_at REAL NOT NULL
+                    )
+                ''')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_digest ON entries(digest)')
+            self._ready = True
+
+    def object_path(self, digest):
+        return os.path.join(self.directory, 'objects', digest[:2], digest)
+
+    def get(self, key):
+        """Look up a cache entry.
+
+        Returns a dict with the stored fields plus 'path' and 'fresh', or None
+        on a miss. Failed fetches come back with a non-200 status.
+        """
+        self._ensure_ready()
+        now = time.time()
+        with closing(self._connect()) as conn:
+            row = conn.execute('SELECT * FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row['accessed_at'] > TOUCH_INTERVAL:
+                conn.execute('UPDATE entries SET accessed_at = ? WHERE key = ?', (now, key))
+
+        entry = dict(row)
+        if entry['status'] == 200:
+            entry['path'] = self.object_path(entry['digest'])
+            if not os.path.exists(entry['path']):
+                # Evicted by another worker between the lookup and now
+                return None
+            entry['fresh'] = now - entry['fetched_at'] < self.ttl
+        else:
+            entry['path'] = None
+            entry['fresh'] = now - entry['fetched_at'] < self.negative_ttl
+        return entry
+
+    def new_temp_file(self):
+        """Open a temporary file on the cache filesystem for an incoming body."""
+        self._ensure_ready()
+        return tempfile.NamedTemporaryFile(dir=self.directory, prefix='.incoming-', delete=False)
+
+    def put(self, key, temp_path, digest, size, content_type, etag=None, last_modified=None):
+        """Move a downloaded body into the cache and index it under key."""
+        self._ensure_ready()
+        path = self.object_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.unlink(temp_path)
+        else:
+            os.replace(temp_path, path)
+
+        now = time.time()
+        with closing(self._connect()) as conn:
+            previous = self._previous_digest(conn, key)
+            conn.execute('''
+                INSERT OR REPLACE INTO entries
+                (key, digest, content_type, size, etag, last_modified, status, error, fetched_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, 200, NULL, ?, ?)
+            ''', (key, digest, content_type, size, etag, last_modified, now, now))
+            if previous != digest:
+                self._release(conn, previous)
+            self._evict(conn)
+        return self.get(key)
+
+    def put_failure(self, key, status, error):
+        """Remember a failed fetch for negative_ttl seconds."""
+        self._ensure_ready()
+        now = time.time()
+        with closing(self._connect()) as conn:
+            previous = self._previous_digest(conn, key)
+            conn.execute('''
+                INSERT OR REPLACE INTO entries
+                (key, digest, content_type, size, etag, last_modified, status, error, fetched_at, accessed_at)
+                VALUES (?, NULL, NULL, 0, NULL, NULL, ?, ?, ?, ?)
+            ''', (key, status, error, now, now))
+            self._release(conn, previous)
+            conn.execute('DELETE FROM entries WHERE status != 200 AND fetched_at < ?', (now - self.negative_ttl,))
+
+    def revalidated(self, key, etag=None, last_modified=None):
+        """Mark an entry fresh again after the origin answered 304."""
+        self._ensure_ready()
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute('''
+                UPDATE entries
+                SET fetched_at = ?, accessed_at = ?,
+                    etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                WHERE key = ?
+            ''', (now, now, etag, last_modified, key))
+        return self.get(key)
+
+    def _previous_digest(self, conn, key):
+        """Digest of the body key points at before it is replaced, if any."""
+        row = conn.execute('SELECT digest FROM entries WHERE key = ?', (key,)).fetchone()
+        return row['digest'] if row is not None else None
+
+    def _release(self, conn, digest):
+        """Delete a body from objects/ once no entry refers to it."""
+        if digest is None:
+            return
+        # Bodies are shared between URLs that serve identical bytes
+        if conn.execute('SELECT 1 FROM entries WHERE digest = ? LIMIT 1', (digest,)).fetchone() is None:
+            try:
+                os.unlink(self.object_path(digest))
+            except FileNotFoundError:
+                pass
+
+    def _evict(self, conn):
+        """Drop least recently used entries until the cache is back under 90% of its budget."""
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        target = self.max_bytes * 0.9
+        victims = []
+        for row in conn.execute('SELECT key, digest, size FROM entries WHERE status = 200 ORDER BY accessed_at'):
+            if total <= target:
+                break
+            victims.append((row['key'], row['digest']))
+            total -= row['size']
+
+        for key, digest in victims:
+            conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+            self._release(conn, digest)
+        logger.info(f"[CACHE] Evicted {len(victims)} images")
+
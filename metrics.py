@@ -0,0 +1,168 @@
+"""Counters and latency histograms, shared by every worker process.
+
+Each process accumulates samples in memory and a background thread adds them
+to a small SQLite file every few seconds, so recording a sample never touches
+the disk. /metrics sums what every process has flushed and renders it in the
+Prometheus text format.
+"""
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, from a cached page up to a slow publisher timing out
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(labels):
+    """Render labels as the inside of a Prometheus label set, in a stable order."""
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in sorted(labels.items()))
+
+
+class Metrics:
+    """A registry of counters and histograms flushed to a shared SQLite file."""
+
+    def __init__(self, path, flush_interval=5, buckets=DEFAULT_BUCKETS):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.buckets = tuple(buckets)
+        self.descriptions = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher = None
+        self._ready = False
+
+    def describe(self, name, kind, help_text):
+        """Declare a metric's type ('counter' or 'histogram') and help text."""
+        self.descriptions[name] = (kind, help_text)
+
+    def inc(self, name, value=1, **labels):
+        """Add value to a counter."""
+        key = (name, format_labels(labels), '')
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + value
+        self._ensure_flusher()
+
+    def observe(self, name, value, **labels):
+        """Record one observation in a histogram."""
+        label_text = format_labels(labels)
+        with self._lock:
+            for bound in self.buckets:
+                if value <= bound:
+                    key = (name, label_text, repr(float(bound)))
+                    self._pending[key] = self._pending.get(key, 0) + 1
+                    break
+            # Buckets are stored non-cumulatively and summed when rendered
+            for le, amount in (('count', 1), ('sum', value)):
+                key = (name, label_text, le)
+                self._pending[key] = self._pending.get(key, 0) + amount
+        self._ensure_flusher()
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe how long the block takes, in seconds, even if it raises."""
+        started = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        if not self._ready:
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS samples (
+                    name TEXT NOT NULL,
+                    labels TEXT NOT NULL,
+                    le TEXT NOT NULL,
+                    value REAL NOT NULL,
+                    PRIMARY KEY (name, labels, le)
+                ) WITHOUT ROWID
+            ''')
+            self._ready = True
+        conn.execute('PRAGMA synchronous = NORMAL')
+        return conn
+
+    def _ensure_flusher(self):
+        if self._flusher is not None:
+            return
+        with self._flush_lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run_flusher, name='metrics-flush', daemon=True)
+                self._flusher.start()
+                atexit.register(self.flush)
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """Add this process's samples since the last flush to the shared file."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            try:
+                with closing(self._connect()) as conn:
+                    conn.execute('BEGIN IMMEDIATE')
+                    conn.executemany('''
+                        INSERT INTO samples (name, labels, le, value) VALUES (?, ?, ?, ?)
+                        ON CONFLICT(name, labels, le) DO UPDATE SET value = value + excluded.value
+                    ''', [(*key, value) for key, value in pending.items()])
+                    conn.execute('COMMIT')
+            except Exception as e:
+                logger.error(f"[METRICS] Error flushing {len(pending)} samples: {str(e)}")
+                # Keep them for the next flush rather than losing them
+                with self._lock:
+                    for key, value in pending.items():
+                        self._pending[key] = self._pending.get(key, 0) + value
+
+    def render(self):
+        """Every process's samples in the Prometheus text exposition format."""
+        self.flush()
+        with closing(self._connect()) as conn:
+            rows = conn.execute('SELECT name, labels, le, value FROM samples ORDER BY name, labels').fetchall()
+
+        series = {}
+        for name, labels, le, value in rows:
+            series.setdefault(name, {}).setdefault(labels, {})[le] = value
+
+        lines = []
+        for name, by_labels in series.items():
+            kind, help_text = self.descriptions.get(name, ('untyped', ''))
+            if help_text:
+                lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, values in by_labels.items():
+                if '' in values:
+                    lines.append(f'{name}{_braced(labels)} {_number(values[""])}')
+                    continue
+                prefix = f'{labels},' if labels else ''
+                cumulative = 0
+                for bound in self.buckets:
+                    cumulative += values.get(repr(float(bound)), 0)
+                    lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {_number(cumulative)}')
+                lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {_number(values.get("count", 0))}')
+                lines.append(f'{name}_sum{_braced(labels)} {_number(values.get("sum", 0))}')
+                lines.append(f'{name}_count{_braced(labels)} {_number(values.get("count", 0))}')
+        return '\n'.join(lines) + '\n'
+
+
+def _braced(labels):
+    return f'{{{labels}}}' if labels else ''
+
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
@@ -0,0 +1,43 @@
+"""Incremental extraction of an article's lead image from its page <head>.
+
+Most article pages declare og:image or twitter:image in <head>, so there is
+no need to download or parse the rest of the page to find them.
+"""
+from lxml import etree
+
+# In order of preference
+IMAGE_META_KEYS = ('og:image', 'twitter:image')
+
+
+def read_head_image(chunks):
+    """Feed chunks of an HTML page to a pull parser until <head> is done.
+
+    chunks must be an iterator; it is left positioned after the last chunk
+    read, so the caller can keep reading the body. Returns (key, image,
+    consumed): which meta tag was used and its content, (None, None) if the
+    head has neither, and the bytes read so far.
+    """
+    parser = etree.HTMLPullParser(events=('start', 'end'))
+    found = {}
+    consumed = []
+    for chunk in chunks:
+        consumed.append(chunk)
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            if event == 'start' and element.tag == 'meta':
+                key = (element.get('property') or element.get('name') or '').strip().lower()
+                content = (element.get('content') or '').strip()
+                if key in IMAGE_META_KEYS and content and key not in found:
+                    found[key] = content
+                    if key == IMAGE_META_KEYS[0]:
+                        return key, content, b''.join(consumed)
+            elif (event == 'end' and element.tag == 'head') or (event == 'start' and element.tag == 'body'):
+                return (*_preferred(found), b''.join(consumed))
+    return (*_preferred(found), b''.join(consumed))
+
+
+def _preferred(found):
+    for key in IMAGE_META_KEYS:
+        if key in found:
+            return key, found[key]
+    return None, None
@@ -0,0 +1,148 @@
+"""Staged ingestion engine with bounded queues between stages."""
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Sentinel telling a stage worker that its input is exhausted
+_STOP = object()
+
+
+class Stage:
+    """A single pipeline stage.
+
+    func takes one item and returns an iterable of items for the next stage,
+    or None to drop the item. Stages that make outbound requests set
+    uses_budget so they draw from the pipeline-wide concurrency budget;
+    it may also be a predicate, for items that can pass through without
+    touching the network.
+
+    With batch_size > 1, func instead receives a list of up to batch_size
+    items, collected for at most batch_wait seconds.
+    """
+
+    def __init__(self, name, func, workers=1, queue_size=100, uses_budget=False,
+                 batch_size=1, batch_wait=0.5):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue_size = queue_size
+        self.uses_budget = uses_budget
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+
+
+class Pipeline:
+    """Run items through a chain of stages.
+
+    Each stage reads from a bounded queue, so a slow stage blocks the one
+    before it instead of letting work pile up in memory. The concurrency
+    budget caps how many budgeted stage calls run at the same time across
+    all stages.
+    """
+
+    def __init__(self, stages, concurrency=8):
+        self.stages = stages
+        self.budget = threading.BoundedSemaphore(concurrency)
+
+    def run(self, items):
+        """Feed items into the first stage and block until every stage drains.
+
+        Returns a (outputs, stats) tuple, where outputs collects whatever the
+        last stage returned.
+        """
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        outputs = []
+        remaining = [stage.workers for stage in self.stages]
+        stats = {stage.name: {'in': 0, 'out': 0, 'errors': 0, 'seconds': 0.0} for stage in self.stages}
+        lock = threading.Lock()
+
+        threads = []
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(index, queues, remaining, stats, outputs, lock),
+                    name=f'{stage.name}-{n}',
+                    daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        for item in items:
+            queues[0].put(item)
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_STOP)
+
+        for thread in threads:
+            thread.join()
+
+        return outputs, stats
+
+    def _next_batch(self, stage, inbox, first):
+        """Collect a batch starting with first; also report whether _STOP was seen."""
+        batch = [first]
+        deadline = time.monotonic() + stage.batch_wait
+        while len(batch) < stage.batch_size:
+            try:
+                item = inbox.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _work(self, index, queues, remaining, stats, outputs, lock):
+        stage = self.stages[index]
+        inbox = queues[index]
+        outbox = queues[index + 1] if index + 1 < len(queues) else None
+        stage_stats = stats[stage.name]
+
+        stopping = False
+        while not stopping:
+            item = inbox.get()
+            if item is _STOP:
+                break
+
+            count = 1
+            if stage.batch_size > 1:
+                item, stopping = self._next_batch(stage, inbox, item)
+                count = len(item)
+
+            started = time.monotonic()
+            try:
+                if stage.uses_budget is True or (callable(stage.uses_budget) and stage.uses_budget(item)):
+                    with self.budget:
+                        results = stage.func(item)
+                else:
+                    results = stage.func(item)
+                results = list(results or [])
+            except Exception as e:
+                logger.error(f"[PIPELINE] {stage.name} failed: {str(e)}")
+                results = []
+                with lock:
+                    stage_stats['errors'] += count
+
+            with lock:
+                stage_stats['in'] += count
+                stage_stats['out'] += len(results)
+                stage_stats['seconds'] += time.monotonic() - started
+
+            # Blocks while the next stage is saturated
+            if outbox is not None:
+                for result in results:
+                    outbox.put(result)
+            else:
+                with lock:
+                    outputs.extend(results)
+
+        with lock:
+            remaining[index] -= 1
+            last_worker = remaining[index] == 0
+
+        if last_worker and outbox is not None:
+            for _ in range(self.stages[index + 1].workers):
+                outbox.put(_STOP)
@@ -0,0 +1,100 @@
+"""Incremental static snapshots of the site, for hosting without Python.
+
+A snapshot is a directory of files. Content-addressed files carry a hash of
+their body in the name, so they can be cached forever. Shards are rebuilt
+only when their fingerprint differs from the previous export, which is
+recorded in a state file beside the snapshot directory, so it is never
+published with it. Files the previous export wrote that this one doesn't are
+removed when it finishes.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+STATE_SUFFIX = '-export-state.json'
+LEGACY_STATE_FILE = '.export-state.json'  # Older exports kept their state inside out_dir
+HASH_LENGTH = 16
+
+
+class Snapshot:
+    """One export into out_dir, reusing unchanged shards from the last one."""
+
+    def __init__(self, out_dir, state_path=None):
+        self.out_dir = out_dir
+        if state_path is None:
+            out_dir = os.path.abspath(out_dir)
+            state_path = os.path.join(os.path.dirname(out_dir), f'.{os.path.basename(out_dir)}{STATE_SUFFIX}')
+        self.state_path = state_path
+        try:
+            with open(self.state_path) as f:
+                previous = json.load(f)
+        except (FileNotFoundError, ValueError):
+            previous = {}
+        self.previous_shards = previous.get('shards', {})
+        self.previous_files = set(previous.get('files', []))
+        self.shards = {}
+        self.files = set()
+        self.counts = {'written': 0, 'unchanged': 0, 'shards_built': 0, 'shards_reused': 0, 'removed': 0}
+
+    def _path(self, rel_path):
+        return os.path.join(self.out_dir, *rel_path.split('/'))
+
+    def write(self, rel_path, body):
+        """Write body at rel_path unless the file already holds exactly that."""
+        self.files.add(rel_path)
+        path = self._path(rel_path)
+        try:
+            with open(path, 'rb') as f:
+                if f.read() == body:
+                    self.counts['unchanged'] += 1
+                    return
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix='.export-', delete=False) as f:
+            f.write(body)
+        os.replace(f.name, path)
+        self.counts['written'] += 1
+
+    def write_hashed(self, rel_dir, stem, body, suffix='.json'):
+        """Write a content-addressed file and return its URL path."""
+        digest = hashlib.sha256(body).hexdigest()[:HASH_LENGTH]
+        rel_path = f'{rel_dir}/{stem}.{digest}{suffix}'
+        self.write(rel_path, body)
+        return '/' + rel_path
+
+    def shard(self, key, fingerprint, rel_dir, stem, build):
+        """URL path of a shard, calling build() for its body only if fingerprint changed."""
+        previous = self.previous_shards.get(key)
+        if previous and previous['fingerprint'] == fingerprint and os.path.exists(self._path(previous['url'][1:])):
+            self.files.add(previous['url'][1:])
+            self.shards[key] = previous
+            self.counts['shards_reused'] += 1
+            return previous['url']
+
+        url = self.write_hashed(rel_dir, stem, build())
+        self.shards[key] = {'fingerprint': fingerprint, 'url': url}
+        self.counts['shards_built'] += 1
+        return url
+
+    def finish(self):
+        """Remove files that are no longer part of the snapshot and save the state."""
+        for rel_path in self.previous_files - self.files:
+            try:
+                os.unlink(self._path(rel_path))
+                self.counts['removed'] += 1
+            except FileNotFoundError:
+                pass
+        try:
+            os.unlink(self._path(LEGACY_STATE_FILE))
+        except FileNotFoundError:
+            pass
+        os.makedirs(self.out_dir, exist_ok=True)
+        with open(self.state_path, 'w') as f:
+            json.dump({'shards': self.shards, 'files': sorted(self.files)}, f)
+        logger.info("[EXPORT] " + ", ".join(f"{k} {v}" for k, v in self.counts.items()))
+        return self.counts